@@ -0,0 +1,185 @@
+"""Load test for the reaction commands against a local otakugifs stand-in.
+
+Run from the repository root, for example:
+
+    python -m benchmarks.bench_reactions --concurrency 200 --requests 5000 --latency-ms 250 --error-rate 0.05
+
+The stand-in API sleeps for the configured latency (plus jitter) and fails a
+configurable share of requests. Commands are driven through the real
+Reactions cog with a fake Context, and the report shows throughput, command
+latency percentiles and the worst event-loop lag seen during the run.
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import tempfile
+import time
+
+import discord
+from aiohttp import web
+from discord.ext import commands
+
+from cogs.fun.reactions import REACTIONS, Reactions
+from utils.db import close_all
+from utils.gif_catalog import GifCatalog
+from utils.gif_pool import GifPool
+from utils.gif_providers import GifProvider, GifRouter
+from utils.http import create_session
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the reaction commands against a local GIF API stand-in.")
+    parser.add_argument("--concurrency", type=int, default=200, help="commands in flight at once")
+    parser.add_argument("--requests", type=int, default=2000, help="total commands to run")
+    parser.add_argument("--latency-ms", type=float, default=150.0, help="stand-in API latency")
+    parser.add_argument("--jitter-ms", type=float, default=50.0, help="random extra API latency, up to this much")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of API requests answered with HTTP 500")
+    parser.add_argument("--send-latency-ms", type=float, default=0.0, help="simulated Discord send latency")
+    parser.add_argument("--reactions", default="", help="comma-separated reactions to use (default: all)")
+    parser.add_argument("--warmup", type=float, default=0.0, help="seconds to let the GIF pool fill before starting")
+    parser.add_argument("--no-pool", action="store_true", help="disable prefetching so every command fetches live")
+    parser.add_argument("--no-catalog", action="store_true", help="disable the on-disk GIF catalog fallback")
+    return parser.parse_args()
+
+
+def percentile(ordered, fraction):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class StandInAPI:
+    def __init__(self, latency, jitter, error_rate):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.requests = 0
+        self.counter = itertools.count()
+        self.runner = None
+        self.url = None
+
+    async def gif(self, request):
+        self.requests += 1
+        await asyncio.sleep(self.latency + random.random() * self.jitter)
+        if random.random() < self.error_rate:
+            return web.Response(status=500, text="injected failure")
+        reaction = request.query.get("reaction", "unknown")
+        return web.json_response({"url": f"https://gifs.invalid/{reaction}/{next(self.counter)}.gif"})
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/gif", self.gif)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+
+class FakeUser:
+    def __init__(self, user_id):
+        self.id = user_id
+        self.display_name = f"user{user_id}"
+
+
+class FakeChannel:
+    def __init__(self, channel_id):
+        self.id = channel_id
+
+
+class FakeContext:
+    def __init__(self, author, channel, send_latency):
+        self.author = author
+        self.channel = channel
+        self.send_latency = send_latency
+        self.failed = False
+
+    async def send(self, content=None, **kwargs):
+        if kwargs.get("embed") is None:
+            self.failed = True
+        if self.send_latency:
+            await asyncio.sleep(self.send_latency)
+
+
+async def watch_loop_lag(stop, interval=0.01):
+    loop = asyncio.get_running_loop()
+    worst = 0.0
+    while not stop.is_set():
+        before = loop.time()
+        await asyncio.sleep(interval)
+        worst = max(worst, loop.time() - before - interval)
+    return worst
+
+
+async def run(args):
+    api = StandInAPI(args.latency_ms / 1000, args.jitter_ms / 1000, args.error_rate)
+    await api.start()
+
+    bot = commands.Bot(command_prefix=".", intents=discord.Intents.none(), help_command=None)
+    bot.http_session = create_session()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cog = Reactions(bot)
+        cog.router = GifRouter(bot, [GifProvider("standin", api.url + "/gif?reaction={tag}", lambda data: data["url"])])
+        catalog = None if args.no_catalog else GifCatalog(path=os.path.join(tmp, "catalog.db"))
+        cog.pool = GifPool(cog.router, catalog=catalog, min_size=0 if args.no_pool else 2, max_size=0 if args.no_pool else 15)
+
+        wanted = {name.strip() for name in args.reactions.split(",") if name.strip()}
+        reactions = [reaction for reaction in REACTIONS if not wanted or reaction.name in wanted]
+        command_for = {command.name: command for command in cog.get_commands()}
+        for reaction in reactions:
+            cog.pool.track(reaction.tag)
+
+        await cog.cog_load()
+        if args.warmup:
+            await asyncio.sleep(args.warmup)
+
+        latencies = []
+        failures = 0
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def invoke(i):
+            nonlocal failures
+            reaction = random.choice(reactions)
+            ctx = FakeContext(FakeUser(i % 500), FakeChannel(i % 50), args.send_latency_ms / 1000)
+            async with semaphore:
+                start = time.perf_counter()
+                await command_for[reaction.name].callback(cog, ctx)
+                latencies.append(time.perf_counter() - start)
+            failures += ctx.failed
+
+        stop = asyncio.Event()
+        lag_task = asyncio.create_task(watch_loop_lag(stop))
+        started = time.perf_counter()
+        await asyncio.gather(*(invoke(i) for i in range(args.requests)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        max_lag = await lag_task
+
+        await cog.cog_unload()
+        await close_all()
+
+    await bot.http_session.close()
+    await api.stop()
+
+    latencies.sort()
+    print(f"commands:        {len(latencies)} ({failures} failed) at concurrency {args.concurrency}")
+    print(f"API requests:    {api.requests}")
+    print(f"throughput:      {len(latencies) / elapsed:.1f} commands/s")
+    print(f"latency p50:     {percentile(latencies, 0.50) * 1000:.1f} ms")
+    print(f"latency p95:     {percentile(latencies, 0.95) * 1000:.1f} ms")
+    print(f"latency p99:     {percentile(latencies, 0.99) * 1000:.1f} ms")
+    print(f"max loop lag:    {max_lag * 1000:.1f} ms")
+    for name, stats in cog.router.stats.items():
+        print(f"provider {name}: p95 {stats.p95 * 1000:.1f} ms, error rate {stats.error_rate:.1%}, "
+              f"breaker {cog.router.breakers[name].state}")
+
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_args()))
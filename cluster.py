@@ -0,0 +1,103 @@
+"""Run the bot as several processes, each owning a contiguous range of shards.
+
+    python cluster.py --clusters 4            # shard count from Discord
+    python cluster.py --clusters 4 --shards 16
+
+Cluster 0 is the leader: it is the only process that runs bot-wide background
+jobs such as warning expiry. A worker that dies is restarted with backoff.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import signal
+import time
+import urllib.request
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def recommended_shard_count(token):
+    request = urllib.request.Request(
+        "https://discord.com/api/v10/gateway/bot",
+        headers={"Authorization": f"Bot {token}", "User-Agent": "DiscordBot (nyastra, 1.0)"},
+    )
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return json.load(response)["shards"]
+
+
+def shard_ranges(shard_count, clusters):
+    per_cluster, extra = divmod(shard_count, clusters)
+    start = 0
+    for cluster_id in range(clusters):
+        size = per_cluster + (1 if cluster_id < extra else 0)
+        yield cluster_id, list(range(start, start + size))
+        start += size
+
+
+def run_cluster(cluster_id, shard_ids, shard_count):
+    import main
+    main.run(cluster_id=cluster_id, shard_ids=shard_ids, shard_count=shard_count)
+
+
+def start_worker(context, cluster_id, shard_ids, shard_count):
+    process = context.Process(
+        target=run_cluster,
+        args=(cluster_id, shard_ids, shard_count),
+        name=f"nyastra-cluster-{cluster_id}",
+    )
+    process.start()
+    print(f"Started cluster {cluster_id} (pid {process.pid}) with shards {shard_ids[0]}-{shard_ids[-1]}")
+    return process
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Nyastra as a multi-process shard cluster.")
+    parser.add_argument("--clusters", type=int, default=int(os.getenv("CLUSTER_COUNT", "2")))
+    parser.add_argument("--shards", type=int, default=int(os.getenv("SHARD_COUNT", "0")),
+                        help="total shard count (default: Discord's recommendation)")
+    args = parser.parse_args()
+
+    shard_count = args.shards or recommended_shard_count(os.getenv("DISCORD_BOT_TOKEN"))
+    clusters = max(1, min(args.clusters, shard_count))
+    print(f"Running {shard_count} shards across {clusters} clusters")
+
+    context = multiprocessing.get_context("spawn")
+    layout = dict(shard_ranges(shard_count, clusters))
+    workers = {}
+    for cluster_id, shard_ids in layout.items():
+        workers[cluster_id] = start_worker(context, cluster_id, shard_ids, shard_count)
+        # Stagger logins so the clusters don't all IDENTIFY at once.
+        time.sleep(5)
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    restarts = {cluster_id: 0 for cluster_id in layout}
+    while not stopping:
+        time.sleep(1)
+        for cluster_id, process in list(workers.items()):
+            if process.is_alive() or stopping:
+                continue
+            restarts[cluster_id] += 1
+            delay = min(60, 2 ** restarts[cluster_id])
+            print(f"Cluster {cluster_id} exited with code {process.exitcode}, restarting in {delay}s")
+            time.sleep(delay)
+            workers[cluster_id] = start_worker(context, cluster_id, layout[cluster_id], shard_count)
+
+    for process in workers.values():
+        process.terminate()
+    for process in workers.values():
+        process.join(timeout=30)
+
+
+if __name__ == "__main__":
+    main()
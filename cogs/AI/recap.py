@@ -2,62 +2,70 @@ import discord
 from discord.ext import commands
 from discord.ui import View, Button
 import os
-import sqlite3
+import time
 import traceback
 from datetime import datetime
 
 from openai import OpenAI
+from utils.migrations import epoch, open_migrated, rebuild
 
 openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 DB_PATH = "./Databases/AI_recap.db"
 
+RECAPS_TABLE = """CREATE TABLE recaps (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            server_id INTEGER,
+            channel_id INTEGER,
+            author TEXT,
+            timestamp INTEGER,
+            summary TEXT
+        )"""
+
+MIGRATIONS = [
+    # 1: the original schema, with ISO text timestamps.
+    (
+        """CREATE TABLE IF NOT EXISTS recaps (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            server_id INTEGER,
+            channel_id INTEGER,
+            author TEXT,
+            timestamp TEXT,
+            summary TEXT
+        )""",
+        """CREATE TABLE IF NOT EXISTS recap_cooldowns (
+            server_id INTEGER PRIMARY KEY,
+            last_used REAL
+        )""",
+    ),
+    # 2: timestamps as epoch seconds.
+    rebuild("recaps", RECAPS_TABLE, f"id, server_id, channel_id, author, {epoch('timestamp')}, summary"),
+    # 3: .recapview reads the newest recap for a channel.
+    ("CREATE INDEX recaps_channel ON recaps (server_id, channel_id, id)",),
+]
+
 class Recap(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.recap_enabled = True
         self._recap_cooldowns = {}
-        self.init_db()
-        self.load_cooldowns()
-
-    def init_db(self):
-        os.makedirs("./Databases", exist_ok=True)
-        with sqlite3.connect(DB_PATH) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS recaps (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    server_id INTEGER,
-                    channel_id INTEGER,
-                    author TEXT,
-                    timestamp TEXT,
-                    summary TEXT
-                )
-            """)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS recap_cooldowns (
-                    server_id INTEGER PRIMARY KEY,
-                    last_used REAL
-                )
-            """)
-            conn.commit()
-
-    def load_cooldowns(self):
-        with sqlite3.connect(DB_PATH) as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT server_id, last_used FROM recap_cooldowns")
-            rows = cursor.fetchall()
-            for server_id, last_used in rows:
-                self._recap_cooldowns[server_id] = last_used
-
-    def save_cooldown(self, guild_id: int, timestamp: float):
-        with sqlite3.connect(DB_PATH) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO recap_cooldowns (server_id, last_used)
-                VALUES (?, ?)
-                ON CONFLICT(server_id) DO UPDATE SET last_used=excluded.last_used
-            """, (guild_id, timestamp))
-            conn.commit()
+        self.db = None
+
+    async def cog_load(self):
+        self.db = await open_migrated(DB_PATH, MIGRATIONS)
+        for server_id, last_used in await self.db.fetchall("SELECT server_id, last_used FROM recap_cooldowns"):
+            self._recap_cooldowns.setdefault(server_id, last_used)
+
+    def export_state(self):
+        return {"cooldowns": self._recap_cooldowns}
+
+    def import_state(self, state):
+        self._recap_cooldowns.update(state["cooldowns"])
+
+    async def save_cooldown(self, guild_id: int, timestamp: float):
+        await self.db.execute("""
+            INSERT INTO recap_cooldowns (server_id, last_used)
+            VALUES (?, ?)
+            ON CONFLICT(server_id) DO UPDATE SET last_used=excluded.last_used
+        """, (guild_id, timestamp))
 
     async def send_error(self, ctx, message):
         embed = discord.Embed(
@@ -75,7 +83,7 @@ class Recap(commands.Cog):
             await self.send_error(ctx, f"Please enter a number between **15 and 30**, nya~! 🐾\n\nNote that bot messages are not included in summary")
             return
 
-        if not self.recap_enabled:
+        if not self.bot.settings.get(ctx.guild.id, "recap_enabled"):
             await self.send_error(ctx, "Nyaa~ The recap feature is currently disabled! Ask a mod to turn it back on~ 💤")
             return
 
@@ -139,19 +147,16 @@ class Recap(commands.Cog):
             self._recap_cooldowns[ctx.guild.id] = now
             summary = response.choices[0].message.content.strip()
 
-            with sqlite3.connect(DB_PATH) as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT INTO recaps (server_id, channel_id, author, timestamp, summary)
-                    VALUES (?, ?, ?, ?, ?)
-                """, (
-                    ctx.guild.id,
-                    ctx.channel.id,
-                    str(ctx.author),
-                    datetime.utcnow().isoformat(),
-                    summary
-                ))
-                conn.commit()
+            await self.db.execute("""
+                INSERT INTO recaps (server_id, channel_id, author, timestamp, summary)
+                VALUES (?, ?, ?, ?, ?)
+            """, (
+                ctx.guild.id,
+                ctx.channel.id,
+                str(ctx.author),
+                int(time.time()),
+                summary
+            ))
 
             embed = discord.Embed(
                 title="📝 Nyaa~ Chat Recap Time!",
@@ -160,7 +165,7 @@ class Recap(commands.Cog):
             )
             embed.set_footer(text=f"Requested by {ctx.author.display_name} • Powered by Catnips")
             await ctx.send(embed=embed)
-            self.save_cooldown(ctx.guild.id, now)
+            await self.save_cooldown(ctx.guild.id, now)
 
         except discord.DiscordException:
             await self.send_error(ctx, "Oops, something went wrong with Discord! Please try again later, nya~ 🐾")
@@ -172,13 +177,14 @@ class Recap(commands.Cog):
     @commands.command(name="recaptoggle", aliases=["rt"])
     @commands.has_permissions(manage_messages=True)
     async def toggle_recap(self, ctx):
-        self.recap_enabled = not self.recap_enabled
-        state = "enabled" if self.recap_enabled else "disabled"
-        color = discord.Color.green() if self.recap_enabled else discord.Color.red()
+        enabled = not self.bot.settings.get(ctx.guild.id, "recap_enabled")
+        await self.bot.settings.set(ctx.guild.id, recap_enabled=enabled)
+        state = "enabled" if enabled else "disabled"
+        color = discord.Color.green() if enabled else discord.Color.red()
 
         embed = discord.Embed(
             title="🔧 Recap Toggled!",
-            description=f"Recap feature is now **{state}**, nya~!",
+            description=f"Recap feature is now **{state}** for this server, nya~!",
             color=color
         )
         embed.set_footer(text="Powered by Catnips!")
@@ -188,16 +194,13 @@ class Recap(commands.Cog):
     async def view_recaps(self, ctx):
         """View the most recent past chat summary for this channel"""
         try:
-            with sqlite3.connect(DB_PATH) as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT author, timestamp, summary
-                    FROM recaps
-                    WHERE server_id = ? AND channel_id = ?
-                    ORDER BY id DESC
-                    LIMIT 1
-                """, (ctx.guild.id, ctx.channel.id))
-                row = cursor.fetchone()
+            row = await self.db.fetchone("""
+                SELECT author, timestamp, summary
+                FROM recaps
+                WHERE server_id = ? AND channel_id = ?
+                ORDER BY id DESC
+                LIMIT 1
+            """, (ctx.guild.id, ctx.channel.id))
 
             if not row:
                 await self.send_error(ctx, "No past recaps found for this channel, nya~! 🐾")
@@ -209,7 +212,7 @@ class Recap(commands.Cog):
                 description=summary,
                 color=discord.Color.blurple()
             )
-            timestamp_dt = datetime.fromisoformat(timestamp)
+            timestamp_dt = datetime.utcfromtimestamp(timestamp)
             embed.set_footer(text=f"Requested by {author} • {timestamp_dt.strftime('%Y-%m-%d %H:%M UTC+0')} | Powered by Catnips")
             await ctx.send(embed=embed)
 
@@ -1,10 +1,10 @@
-import importlib
-import pkgutil
 from discord.ext import commands
 
+from .ball8 import ball8
+from .reactions import Reactions
+
 async def setup(bot: commands.Bot):
-    for _, name, _ in pkgutil.iter_modules(__path__):
-        module = importlib.import_module(f".{name}", __name__)
-        cog = getattr(module, name)(bot)
-        await bot.add_cog(cog)
-print("Loaded Fun Cog")
\ No newline at end of file
+    await bot.add_cog(Reactions(bot))
+    await bot.add_cog(ball8(bot))
+
+    print("Loaded Fun Cog")
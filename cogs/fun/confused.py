@@ -1,27 +0,0 @@
-from discord.ext import commands
-import requests
-import discord
-
-class confused(commands.Cog):
-    def __init__(self, bot):
-        self.bot = bot
-
-    @commands.command(name='confused')
-    async def confused(self, ctx, member: discord.Member = None):
-        url = "https://api.otakugifs.xyz/gif?reaction=confused"
-        response = requests.get(url)
-        data = response.json()
-        gif_url = data['url']
-
-        if member:
-            title = f"{ctx.author.display_name} is confused about {member.display_name}!"
-        else:
-            title = f"{ctx.author.display_name} is confused on ..?"
-
-        embed = discord.Embed(
-            title=title,
-            color=discord.Color.random()
-        )
-        embed.set_image(url=gif_url)
-
-        await ctx.send(embed=embed)
@@ -0,0 +1,128 @@
+from typing import NamedTuple, Optional
+
+import discord
+from discord.ext import commands
+
+from utils.gif_catalog import GifCatalog
+from utils.gif_pool import FETCH_ERRORS, GifPool
+from utils.gif_providers import GifRouter, providers_from_env
+
+
+class Reaction(NamedTuple):
+    name: str
+    tag: str
+    title: str
+    target_title: Optional[str]
+    description: str
+    aliases: tuple = ()
+
+
+# One row per reaction command. `tag` is the otakugifs reaction name, and a
+# reaction without a `target_title` does not take a member argument.
+REACTIONS = (
+    Reaction("pat", "pat", "{author} is patting themselves!", "{author} is patting {target}!", "Pat someone"),
+    Reaction("hug", "hug", "{author} is hugging at nothingness", "{author} is hugging {target}!", "Hug someone"),
+    Reaction("kiss", "kiss", "{author} is kissing the air", "{author} is kissing {target}!", "Kiss someone"),
+    Reaction("slap", "slap", "{author} is slapping the air", "{author} slaps {target}!", "Slap someone"),
+    Reaction("poke", "poke", "{author} is poking the air", "{author} is poking {target}!", "Poke someone"),
+    Reaction("bite", "bite", "{author} is biting the air for some reason", "{author} is biting at {target}!", "Bite someone"),
+    Reaction("smug", "smug", "{author} is smugging", "{author} is smugging at {target}!", "Smug at someone"),
+    Reaction("dance", "dance", "{author} is dancing", "{author} is dancing with {target}!", "Dance dance dance like MMD"),
+    Reaction("cry", "cry", "{author} is crying", "{author} is crying because of {target}!", "Cry out loud"),
+    Reaction("blush", "blush", "{author} is blushing", "{author} is blushing at {target}!", "Blush at someone"),
+    Reaction("wink", "wink", "{author} is winking", "{author} is winking at {target}!", "Wink at someone"),
+    Reaction("wave", "wave", "{author} is waving away", "{author} is waving at {target}!", "Wave at someone"),
+    Reaction("smile", "smile", "{author} is smiling", "{author} is smiling at {target}!", "Smile at someone"),
+    Reaction("angry", "angrystare", "{author} is angry", "{author} is angry at {target}!", "Get angry at someone"),
+    Reaction("happy", "happy", "{author} is happy", "{author} is happy about {target}!", "Be happy"),
+    Reaction("sad", "sad", "{author} is sad...", "{author} is sad at {target}!", "Be sad"),
+    Reaction("confused", "confused", "{author} is confused on ..?", "{author} is confused about {target}!", "Be confused at someone"),
+    Reaction("pout", "pout", "{author} is pouting!", "{author} is pouting at {target}!", "Pout at someone"),
+    Reaction("sigh", "sigh", "{author} sighs...", "{author} is sighing at {target}...", "Sigh at someone"),
+    Reaction("facepalm", "facepalm", "{author} facepalmed", "{author} facepalmed {target}!", "Facepalm at someone"),
+    Reaction("shrug", "shrug", "{author} shrugs...", "{author} shrugs {target}!", "Shrug at someone"),
+    Reaction("yawn", "yawn", "{author} yawned out loud!", None, "n-nya~ yawn out loud"),
+    Reaction("sneeze", "sneeze", "{author} sneezed!", None, "Sneeze out loud!"),
+    Reaction("sleep", "sleep", "{author} went to sleep, sleep tight!", None, "Go to sleep!"),
+    Reaction("shout", "shout", "{author} is shouting for no reason at all", "{author} is shouting at {target}!", "Shout at someone"),
+    Reaction("laugh", "laugh", "{author} is laughing!", "{author} is laughing at {target}!", "Laugh at someone"),
+)
+
+
+class ReactionEngine(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.router = GifRouter(bot, providers_from_env())
+        self.pool = GifPool(self.router, catalog=GifCatalog())
+        for reaction in REACTIONS:
+            self.pool.track(reaction.tag)
+
+    async def cog_load(self):
+        self.pool.start()
+
+    async def cog_unload(self):
+        await self.pool.stop()
+
+    async def react(self, ctx, reaction, member=None):
+        try:
+            gif_url = await self.pool.get(reaction.tag, ctx.channel.id)
+        except FETCH_ERRORS:
+            await ctx.send("Nyaa~ I couldn't find a gif right now, try again in a bit! 🐾")
+            return
+
+        if member:
+            title = reaction.target_title.format(author=ctx.author.display_name, target=member.display_name)
+        else:
+            title = reaction.title.format(author=ctx.author.display_name)
+
+        embed = discord.Embed(
+            title=title,
+            color=discord.Color.random()
+        )
+        embed.set_image(url=gif_url)
+
+        await ctx.send(embed=embed)
+
+    @commands.command(name="gifproviders", aliases=["gifp"], hidden=True)
+    @commands.is_owner()
+    async def gif_providers(self, ctx):
+        embed = discord.Embed(title="🐾 GIF Providers", color=discord.Color.pink())
+        for provider in self.router.providers:
+            stats = self.router.stats[provider.name]
+            breaker = self.router.breakers[provider.name]
+            embed.add_field(
+                name=provider.name,
+                value=(
+                    f"Breaker: **{breaker.state}** ({breaker.failures} failures)\n"
+                    f"p95: {stats.p95 * 1000:.0f}ms over {len(stats.latencies)} requests\n"
+                    f"Error rate: {stats.error_rate:.0%}"
+                ),
+                inline=False
+            )
+        await ctx.send(embed=embed)
+
+
+def _make_command(reaction):
+    if reaction.target_title is None:
+        async def command(self, ctx):
+            await self.react(ctx, reaction)
+    else:
+        async def command(self, ctx, member: discord.Member = None):
+            await self.react(ctx, reaction, member)
+
+    # discord.py decides whether to skip `self` from the qualname.
+    command.__name__ = f"{reaction.name}_command"
+    command.__qualname__ = f"Reactions.{command.__name__}"
+    return commands.command(name=reaction.name, aliases=list(reaction.aliases), help=reaction.description)(command)
+
+
+# CogMeta only collects commands present when the class is created, so the
+# table-driven commands are put into the namespace of a generated subclass.
+Reactions = commands.CogMeta(
+    "Reactions",
+    (ReactionEngine,),
+    {
+        "__module__": __name__,
+        **{f"{reaction.name}_command": _make_command(reaction) for reaction in REACTIONS},
+    },
+)
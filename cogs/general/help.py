@@ -2,6 +2,8 @@ import discord
 from discord.ext import commands
 from discord.ui import View, Button
 
+from cogs.fun.reactions import REACTIONS
+
 def chunked_fields(fields, size=6):
     for i in range(0, len(fields), size):
         yield fields[i:i + size]
@@ -54,35 +56,8 @@ class HelpView(View):
 
     @discord.ui.button(label="Fun", style=discord.ButtonStyle.primary, row=1)
     async def fun_button(self, interaction: discord.Interaction, button: Button):
-        all_fields = [
-            (".pat", "Pat someone"), 
-            (".hug", "Hug someone"), 
-            (".kiss", "Kiss someone"),
-            (".slap", "Slap someone"), 
-            (".poke", "Poke someone"), 
-            (".bite", "Bite someone"),
-            (".smug", "Smug at someone"), 
-            (".dance", "Dance dance dance like MMD"), 
-            (".cry", "Cry out loud"),
-            (".blush", "Blush at someone"),
-            (".wink", "Wink at someone"),
-            (".wave", "Wave at someone"),
-            (".smile", "Smile at someone"),
-            (".angry", "Get angry at someone"),
-            (".happy", "Be happy"),
-            (".sad", "Be sad"),
-            (".confused", "Be confused at someone"),
-            (".pout", "Pout at someone"),
-            (".sigh", "Sigh at someone"),
-            (".facepalm", "Facepalm at someone"),
-            (".shrug", "Shrug at someone"),
-            (".yawn", "n-nya~ yawn out loud"),
-            (".sneeze", "Sneeze out loud!"),
-            (".sleep", "Go to sleep!"),
-            (".shout", "Shout at someone"),
-            (".laugh", "Laugh at someone"),
-            (".8b", "Ask Nyastra a question!")
-        ]
+        all_fields = [(f".{reaction.name}", reaction.description) for reaction in REACTIONS]
+        all_fields.append((".8b", "Ask Nyastra a question!"))
 
         self.embeds = []
         for i, chunk in enumerate(chunked_fields(all_fields, size=6), start=1):
@@ -0,0 +1,118 @@
+import discord
+from discord.ext import commands
+from datetime import timedelta
+import time
+import traceback
+from utils.cache import format_bytes, memory_report, process_rss
+
+
+def format_ms(seconds):
+    return f"{seconds * 1000:.0f}ms"
+
+
+class Owner(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_check(self, ctx):
+        return await self.bot.is_owner(ctx.author)
+
+    @commands.command(name="stats", hidden=True)
+    async def stats(self, ctx):
+        """Show command, listener and event-loop timings."""
+        metrics = self.bot.metrics
+        uptime = timedelta(seconds=int(time.time() - metrics.started))
+
+        embed = discord.Embed(title="📈 Nyastra Stats", color=discord.Color.pink())
+        embed.add_field(
+            name="Bot",
+            value=(
+                f"Uptime: {uptime}\n"
+                f"Gateway latency: {format_ms(self.bot.latency)}\n"
+                f"Loop lag p99: ≤{format_ms(metrics.loop_lag.quantile(0.99))}, max {format_ms(metrics.loop_lag.max)}"
+            ),
+            inline=False
+        )
+
+        slowest = sorted(metrics.commands.items(), key=lambda item: item[1].quantile(0.95), reverse=True)[:8]
+        if slowest:
+            lines = [
+                f"`{name}` p95 ≤{format_ms(h.quantile(0.95))}, max {format_ms(h.max)}, "
+                f"{h.count} runs, {metrics.command_errors[name]} errors"
+                for name, h in slowest
+            ]
+            embed.add_field(name="Slowest Commands", value="\n".join(lines), inline=False)
+
+        busiest = sorted(metrics.listeners.items(), key=lambda item: item[1].sum, reverse=True)[:8]
+        if busiest:
+            lines = [
+                f"`{name}` total {h.sum:.1f}s, p95 ≤{format_ms(h.quantile(0.95))}, {h.count} calls"
+                for name, h in busiest
+            ]
+            embed.add_field(name="Busiest Listeners", value="\n".join(lines), inline=False)
+
+        if metrics.event_errors:
+            lines = [f"`{event}`: {count}" for event, count in metrics.event_errors.most_common(5)]
+            embed.add_field(name="Event Errors", value="\n".join(lines), inline=False)
+
+        if metrics.rate_limits:
+            lines = [f"`{route}`: {count}" for route, count in metrics.rate_limits.most_common(5)]
+            embed.add_field(name="429s by Route", value="\n".join(lines), inline=False)
+
+        if metrics.outbound_wait:
+            lines = [
+                f"`{priority}` wait p95 ≤{format_ms(h.quantile(0.95))}, {h.count} sent, {metrics.shed[priority]} dropped"
+                for priority, h in sorted(metrics.outbound_wait.items())
+            ]
+            embed.add_field(name="Outbound Queue", value="\n".join(lines), inline=False)
+
+        timings = self.bot.extension_loader.timings
+        if timings:
+            lines = [f"`{name}`: {format_ms(seconds)}" for name, seconds in timings.items()]
+            embed.add_field(name="Extension Load Times", value="\n".join(lines), inline=False)
+
+        await ctx.send(embed=embed)
+
+    @commands.command(name="reload", hidden=True)
+    async def reload(self, ctx, extension: str):
+        """Reload one extension without restarting the bot."""
+        loader = self.bot.extension_loader
+        spec = loader.find(extension)
+        if spec is None:
+            names = ", ".join(f"`{spec.name}`" for spec in loader.manifest)
+            return await ctx.send(f"Unknown extension `{extension}`. Try one of {names}.")
+
+        try:
+            await loader.reload(spec)
+        except commands.ExtensionError as e:
+            traceback.print_exc()
+            return await ctx.send(f"❌ Reloading `{spec.name}` failed:\n```{e}```")
+        await ctx.send(f"🔁 Reloaded `{spec.name}` in {format_ms(loader.timings[spec.name])}.")
+
+    @commands.command(name="memory", hidden=True)
+    async def memory(self, ctx):
+        """Show approximate memory used by each cache."""
+        connection = self.bot._connection
+        report = memory_report(self.bot)
+        cached = sum(size for _, _, size in report)
+
+        embed = discord.Embed(title="🧠 Nyastra Memory", color=discord.Color.pink())
+        embed.add_field(
+            name="Process",
+            value=f"RSS: {format_bytes(process_rss())}\nCaches: ~{format_bytes(cached)}",
+            inline=False
+        )
+        lines = [f"`{name}`: {count:,} entries, ~{format_bytes(size)}" for name, count, size in report]
+        embed.add_field(name="Caches", value="\n".join(lines), inline=False)
+
+        flags = [name for name, enabled in connection.member_cache_flags if enabled] or ["none"]
+        embed.add_field(
+            name="Policy",
+            value=(
+                f"Member cache: {', '.join(flags)}\n"
+                f"Message cache: {connection.max_messages or 'off'}\n"
+                f"Chunking: {'startup' if connection._chunk_guilds else 'lazy' if self.bot.lazy_chunk else 'off'}"
+            ),
+            inline=False
+        )
+        await ctx.send(embed=embed)
@@ -1,30 +1,18 @@
 import discord
 from discord.ext import commands
 from discord.ui import View, Select
-import sqlite3
 from typing import Optional
+from utils.migrations import open_migrated
 
 DB_FILE = "./Databases/Suggestion.db"
 
-def get_db_connection():
-    conn = sqlite3.connect(DB_FILE, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    return conn
-
-def init_db():
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS suggest_settings (
+MIGRATIONS = [
+    ('''CREATE TABLE IF NOT EXISTS suggest_settings (
             guild_id TEXT PRIMARY KEY,
             channel_id INTEGER,
             count INTEGER DEFAULT 0
-        )
-    ''')
-    conn.commit()
-    conn.close()
-
-init_db()
+        )''',),
+]
 
 def has_manage_guild(obj: discord.Interaction | commands.Context) -> bool:
     if isinstance(obj, discord.Interaction):
@@ -79,50 +67,27 @@ class PersistentApproveRejectView(discord.ui.View):
 class Suggest(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.db = None
+
+    async def cog_load(self):
+        self.db = await open_migrated(DB_FILE, MIGRATIONS)
 
     def get_suggest_channel_id(self, guild_id: int) -> Optional[int]:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT channel_id FROM suggest_settings WHERE guild_id = ?', (str(guild_id),))
-        row = cursor.fetchone()
-        conn.close()
-        return row["channel_id"] if row and row["channel_id"] is not None else None
-
-    def set_suggest_channel_id(self, guild_id: int, channel_id: int):
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT guild_id FROM suggest_settings WHERE guild_id = ?', (str(guild_id),))
-        exists = cursor.fetchone()
-        if exists:
-            cursor.execute(
-                'UPDATE suggest_settings SET channel_id = ? WHERE guild_id = ?',
-                (channel_id, str(guild_id))
-            )
-        else:
-            cursor.execute(
-                'INSERT INTO suggest_settings (guild_id, channel_id, count) VALUES (?, ?, ?)',
-                (str(guild_id), channel_id, 0)
-            )
-        conn.commit()
-        conn.close()
-
-    def increment_suggestion_count(self, guild_id: int) -> int:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT count FROM suggest_settings WHERE guild_id = ?', (str(guild_id),))
-        row = cursor.fetchone()
-        if row:
-            new_count = row["count"] + 1
-            cursor.execute('UPDATE suggest_settings SET count = ? WHERE guild_id = ?', (new_count, str(guild_id)))
-        else:
-            new_count = 1
-            cursor.execute(
-                'INSERT INTO suggest_settings (guild_id, channel_id, count) VALUES (?, ?, ?)',
-                (str(guild_id), None, new_count)
+        return self.bot.settings.get(guild_id, "suggest_channel_id")
+
+    async def set_suggest_channel_id(self, guild_id: int, channel_id: int):
+        await self.bot.settings.set(guild_id, suggest_channel_id=channel_id)
+
+    async def increment_suggestion_count(self, guild_id: int) -> int:
+        async with self.db.transaction() as conn:
+            await conn.execute(
+                '''INSERT INTO suggest_settings (guild_id, channel_id, count) VALUES (?, NULL, 1)
+                   ON CONFLICT(guild_id) DO UPDATE SET count = count + 1''',
+                (str(guild_id),)
             )
-        conn.commit()
-        conn.close()
-        return new_count
+            async with conn.execute('SELECT count FROM suggest_settings WHERE guild_id = ?', (str(guild_id),)) as cursor:
+                row = await cursor.fetchone()
+        return row["count"]
 
     class SetChannelView(View):
         def __init__(self, cog, user_id, guild):
@@ -146,7 +111,7 @@ class Suggest(commands.Cog):
 
         async def select_callback(self, interaction: discord.Interaction):
             channel_id = int(self.select.values[0])
-            self.cog.set_suggest_channel_id(self.guild.id, channel_id)
+            await self.cog.set_suggest_channel_id(self.guild.id, channel_id)
             await interaction.response.edit_message(
                 content=f"Suggestion channel set to <#{channel_id}> ✅",
                 view=None
@@ -185,7 +150,7 @@ class Suggest(commands.Cog):
             await ctx.send("The suggestion channel set is invalid or I don't have access to it.\nPlease ask a server manager to set it using `.suggest`")
             return
 
-        count = self.increment_suggestion_count(guild_id)
+        count = await self.increment_suggestion_count(guild_id)
 
         embed = discord.Embed(
             title="🌸 New Suggestion 🌸",
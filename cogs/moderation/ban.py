@@ -1,34 +1,12 @@
 import discord
 from discord.ext import commands
-import sqlite3
-import aiosqlite
-
-DB_FILE = "./Databases/Ban.db"
 
 class BanUnban(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.db = sqlite3.connect(DB_FILE, check_same_thread=False)
-        self.cursor = self.db.cursor()
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS log_channels (
-                guild_id INTEGER PRIMARY KEY,
-                channel_id INTEGER
-            )
-        ''')
-        self.db.commit()
-
-    def get_log_channel_id(self, guild_id):
-        self.cursor.execute('SELECT channel_id FROM log_channels WHERE guild_id = ?', (guild_id,))
-        result = self.cursor.fetchone()
-        return result[0] if result else None
-
-    def set_log_channel_id(self, guild_id, channel_id):
-        self.cursor.execute('REPLACE INTO log_channels (guild_id, channel_id) VALUES (?, ?)', (guild_id, channel_id))
-        self.db.commit()
 
     async def log_action(self, ctx, guild, embed):
-        channel_id = self.get_log_channel_id(guild.id)
+        channel_id = self.bot.settings.get(guild.id, "log_channel_id")
         if not channel_id:
             embed = discord.Embed(
                 title="⚠️ Log Channel Not Set!",
@@ -41,12 +19,12 @@ class BanUnban(commands.Cog):
         if not channel:
             await self.send_error(ctx, "The configured log channel was deleted, nya~!\nPlease set a new one with `.setlogchannel [#channel]`")
             return
-        await channel.send(embed=embed)
+        self.bot.modlog.post(channel, embed)
 
     @commands.command(name="setlogchannel", aliases=["setlog", "slc"])
     @commands.has_permissions(administrator=True)
     async def set_log_channel(self, ctx, channel: discord.TextChannel):
-        self.set_log_channel_id(ctx.guild.id, channel.id)
+        await self.bot.settings.set(ctx.guild.id, log_channel_id=channel.id)
         embed = discord.Embed(
             title="🐾 Log Channel Set!",
             description=f"Logs will now be sent to {channel.mention}, nya~",
@@ -1,29 +1,12 @@
 import discord
 from discord.ext import commands
-import sqlite3
-
-DB_FILE = "./Databases/Ban.db"
 
 class Kick(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.db = sqlite3.connect(DB_FILE, check_same_thread=False)
-        self.cursor = self.db.cursor()
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS log_channels (
-                guild_id INTEGER PRIMARY KEY,
-                channel_id INTEGER
-            )
-        ''')
-        self.db.commit()
-
-    def get_log_channel_id(self, guild_id):
-        self.cursor.execute('SELECT channel_id FROM log_channels WHERE guild_id = ?', (guild_id,))
-        result = self.cursor.fetchone()
-        return result[0] if result else None
 
     async def log_action(self, ctx, guild, embed):
-        channel_id = self.get_log_channel_id(guild.id)
+        channel_id = self.bot.settings.get(guild.id, "log_channel_id")
         if not channel_id:
             embed = discord.Embed(
                 title="⚠️ Log Channel Not Set!",
@@ -36,7 +19,7 @@ class Kick(commands.Cog):
         if not channel:
             await self.send_error(ctx, "The configured log channel was deleted, nya~! Please set a new one.")
             return
-        await channel.send(embed=embed)
+        self.bot.modlog.post(channel, embed)
 
     async def send_error(self, ctx, message):
         embed = discord.Embed(
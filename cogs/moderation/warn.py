@@ -1,18 +1,25 @@
 import discord
 from discord.ext import commands, tasks
-import sqlite3
-import os
-from datetime import datetime, timedelta
+import time
 import uuid
 import re
+from utils.migrations import epoch, open_migrated, rebuild
 
-class Warn(commands.Cog):
-    def __init__(self, bot):
-        self.bot = bot
-        os.makedirs('./Databases', exist_ok=True)
-        self.db = sqlite3.connect('./Databases/Warn.db', check_same_thread=False)
-        self.cursor = self.db.cursor()
-        self.cursor.execute('''CREATE TABLE IF NOT EXISTS warnings (
+DB_FILE = './Databases/Warn.db'
+
+WARNINGS_TABLE = '''CREATE TABLE warnings (
+            warn_id TEXT PRIMARY KEY NOT NULL,
+            guild_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            moderator_id INTEGER NOT NULL,
+            reason TEXT NOT NULL,
+            timestamp INTEGER NOT NULL,
+            duration INTEGER
+        )'''
+
+MIGRATIONS = [
+    # 1: the original schema, with ISO text timestamps.
+    ('''CREATE TABLE IF NOT EXISTS warnings (
             warn_id TEXT PRIMARY KEY NOT NULL,
             guild_id INTEGER NOT NULL,
             user_id INTEGER NOT NULL,
@@ -20,19 +27,30 @@ class Warn(commands.Cog):
             reason TEXT NOT NULL,
             timestamp TEXT NOT NULL,
             duration INTEGER
-        )''')
-        self.db.commit()
+        )''',),
+    # 2: timestamps as epoch seconds.
+    rebuild('warnings', WARNINGS_TABLE,
+            f"warn_id, guild_id, user_id, moderator_id, reason, {epoch('timestamp')}, duration"),
+    # 3: indexes for .warns and the expiry check.
+    (
+        'CREATE INDEX warnings_guild_user ON warnings (guild_id, user_id)',
+        'CREATE INDEX warnings_expiry ON warnings (timestamp + duration) WHERE duration IS NOT NULL',
+    ),
+]
+
+class Warn(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.db = None
 
-        self.ban_db = sqlite3.connect('./Databases/Ban.db', check_same_thread=False)
-        self.ban_cursor = self.ban_db.cursor()
-        self.check_expired_warnings.start()
+    async def cog_load(self):
+        self.db = await open_migrated(DB_FILE, MIGRATIONS)
+        # Only one cluster process should run bot-wide background loops.
+        if self.bot.is_leader:
+            self.check_expired_warnings.start()
 
-    def get_log_channel(self, guild_id):
-        self.ban_cursor.execute('SELECT channel_id FROM log_channels WHERE guild_id = ?', (guild_id,))
-        result = self.ban_cursor.fetchone()
-        if result:
-            return int(result[0])
-        return None
+    async def cog_unload(self):
+        self.check_expired_warnings.cancel()
 
     def format_embed(self, title, description, color=discord.Color.orange()):
         return discord.Embed(
@@ -79,10 +97,8 @@ class Warn(commands.Cog):
             reason = " ".join(parts).strip() if parts else "No reason provided"
 
         warn_id = str(uuid.uuid4())[:8]
-        now = datetime.utcnow()
-        self.cursor.execute('INSERT INTO warnings VALUES (?, ?, ?, ?, ?, ?, ?)',
-            (warn_id, ctx.guild.id, member.id, ctx.author.id, reason, now.isoformat(), duration))
-        self.db.commit()
+        await self.db.execute('INSERT INTO warnings VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (warn_id, ctx.guild.id, member.id, ctx.author.id, reason, int(time.time()), duration))
 
         embed = self.format_embed(
             "User Warned",
@@ -94,23 +110,21 @@ class Warn(commands.Cog):
         )
         await ctx.send(embed=embed)
 
-        log_channel_id = self.get_log_channel(ctx.guild.id)
+        log_channel_id = self.bot.settings.get(ctx.guild.id, "log_channel_id")
         if log_channel_id:
             log_channel = ctx.guild.get_channel(log_channel_id)
             if log_channel:
-                await log_channel.send(embed=embed)
+                self.bot.modlog.post(log_channel, embed)
 
     @commands.command()
     @commands.has_permissions(manage_messages=True)
     async def unwarn(self, ctx, warn_id: str):
-        self.cursor.execute('SELECT * FROM warnings WHERE warn_id = ?', (warn_id,))
-        row = self.cursor.fetchone()
+        row = await self.db.fetchone('SELECT * FROM warnings WHERE warn_id = ?', (warn_id,))
 
         if not row:
             return await ctx.send(embed=self.format_embed("Not Found", f"No warning found with ID `{warn_id}`, nya~", discord.Color.red()))
 
-        self.cursor.execute('DELETE FROM warnings WHERE warn_id = ?', (warn_id,))
-        self.db.commit()
+        await self.db.execute('DELETE FROM warnings WHERE warn_id = ?', (warn_id,))
 
         user_id = row[2]
         reason = row[4]
@@ -124,27 +138,19 @@ class Warn(commands.Cog):
         )
         await ctx.send(embed=embed)
 
-        log_channel_id = self.get_log_channel(ctx.guild.id)
+        log_channel_id = self.bot.settings.get(ctx.guild.id, "log_channel_id")
         if log_channel_id:
             log_channel = ctx.guild.get_channel(log_channel_id)
             if log_channel:
-                await log_channel.send(embed=embed)
+                self.bot.modlog.post(log_channel, embed)
 
     @commands.command(aliases=["warnings"])
     async def warns(self, ctx, user: discord.User = None):
         user = user or ctx.author
-        now = datetime.utcnow()
-
-        self.cursor.execute('SELECT * FROM warnings WHERE guild_id = ? AND user_id = ?', (ctx.guild.id, user.id))
-        all_warnings = self.cursor.fetchall()
-
-        filtered = []
-        for row in all_warnings:
-            warn_time = datetime.fromisoformat(row[5])
-            duration = row[6]
-            expired = duration and (now > warn_time + timedelta(seconds=duration))
-            if not expired:
-                filtered.append(row)
+        filtered = await self.db.fetchall(
+            'SELECT * FROM warnings WHERE guild_id = ? AND user_id = ? AND (duration IS NULL OR timestamp + duration >= ?)',
+            (ctx.guild.id, user.id, int(time.time()))
+        )
 
         if not filtered:
             return await ctx.send(embed=self.format_embed("No Active Warnings", f"{user.mention} has no active warnings, nya~"))
@@ -158,7 +164,7 @@ class Warn(commands.Cog):
             duration = row[6]
             embed.add_field(
                 name=f"🆔 {warn_id} - ⚠️ Active",
-                value=f"📄 **Reason:** {reason}\n🛡️ <@{mod_id}>\n🕒 <t:{int(datetime.fromisoformat(timestamp).timestamp())}:R>\n⏳ Duration: {'∞' if not duration else str(duration)+'s'}",
+                value=f"📄 **Reason:** {reason}\n🛡️ <@{mod_id}>\n🕒 <t:{timestamp}:R>\n⏳ Duration: {'∞' if not duration else str(duration)+'s'}",
                 inline=False
             )
         await ctx.send(embed=embed)
@@ -167,13 +173,11 @@ class Warn(commands.Cog):
 
     @tasks.loop(minutes=5)
     async def check_expired_warnings(self):
-        now = datetime.utcnow()
-        self.cursor.execute('SELECT warn_id, timestamp, duration FROM warnings WHERE duration IS NOT NULL')
-        rows = self.cursor.fetchall()
-        for warn_id, timestamp_str, duration in rows:
-            timestamp = datetime.fromisoformat(timestamp_str)
-            if now > timestamp + timedelta(seconds=duration):
-                pass
+        rows = await self.db.fetchall(
+            'SELECT warn_id FROM warnings WHERE duration IS NOT NULL AND timestamp + duration < ?', (int(time.time()),)
+        )
+        for warn_id, in rows:
+            pass
 
     @warn.error
     @unwarn.error
@@ -0,0 +1,8 @@
+from discord.ext import commands
+
+from .vct import VCTracker
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(VCTracker(bot))
+
+    print("Loaded Voice Cog")
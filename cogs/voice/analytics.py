@@ -0,0 +1,120 @@
+import io
+import sqlite3
+
+import numpy as np
+from matplotlib.figure import Figure
+
+HOUR = 3600
+HOURS_PER_WEEK = 168
+# The Unix epoch was a Thursday; this shifts hour 0 of the week to Monday 00:00 UTC.
+EPOCH_WEEK_OFFSET = 3 * 24
+DAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+
+def load_sessions(db_path, guild_id, since, until):
+    """A guild's sessions overlapping [since, until), clipped to it, as
+    (channel names, channel index per session, starts, ends) arrays."""
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, timeout=30)
+    try:
+        rows = conn.execute("""
+            SELECT vc_channel, MAX(start_time, ?), MIN(end_time, ?) FROM sessions
+            WHERE guild_id = ? AND end_time > ? AND start_time < ?
+        """, (since, until, guild_id, since, until)).fetchall()
+    finally:
+        conn.close()
+    if not rows:
+        return np.array([], dtype=str), np.array([], dtype=np.int64), np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+    names, starts, ends = zip(*rows)
+    starts = np.array(starts, dtype=np.int64)
+    ends = np.array(ends, dtype=np.int64)
+    channel_names, channels = np.unique(np.array(names), return_inverse=True)
+    keep = ends > starts
+    return channel_names, channels[keep], starts[keep], ends[keep]
+
+
+def hour_of_week_occupancy(starts, ends, since, until):
+    """Average number of people in voice for each hour of the week, as a
+    7 x 24 array starting Monday 00:00 UTC."""
+    # One row per (session, hour it touches), without a Python loop.
+    first = starts // HOUR
+    spans = (ends - 1) // HOUR - first + 1
+    session = np.repeat(np.arange(len(starts)), spans)
+    hours = first[session] + np.arange(spans.sum()) - np.repeat(np.cumsum(spans) - spans, spans)
+    overlap = np.minimum(ends[session], (hours + 1) * HOUR) - np.maximum(starts[session], hours * HOUR)
+    seconds = np.bincount((hours + EPOCH_WEEK_OFFSET) % HOURS_PER_WEEK, weights=overlap, minlength=HOURS_PER_WEEK)
+
+    # How often each hour of the week occurs in the range, to turn the
+    # seconds into an average.
+    range_hours = np.arange(since // HOUR, -(-until // HOUR))
+    occurrences = np.bincount((range_hours + EPOCH_WEEK_OFFSET) % HOURS_PER_WEEK, minlength=HOURS_PER_WEEK)
+    return (seconds / np.maximum(occurrences, 1) / HOUR).reshape(7, 24)
+
+
+def peak_concurrency(channels, starts, ends):
+    """The most people in each channel at once, and when that first happened.
+
+    Returns (channel index, peak, time) arrays with one entry per channel
+    that had any sessions.
+    """
+    count = len(starts)
+    times = np.concatenate([starts, ends])
+    deltas = np.concatenate([np.ones(count, dtype=np.int64), -np.ones(count, dtype=np.int64)])
+    owners = np.concatenate([channels, channels])
+    # Sweep line: by channel, then time, with leaves before joins at the same
+    # second so back-to-back sessions don't overlap.
+    order = np.lexsort((deltas, times, owners))
+    times, deltas, owners = times[order], deltas[order], owners[order]
+    # Every channel's joins and leaves cancel out, so one running total
+    # across all channels starts at zero again at each channel's first event.
+    level = np.cumsum(deltas)
+    starts_at = np.flatnonzero(np.r_[True, owners[1:] != owners[:-1]])
+    peaks = np.maximum.reduceat(level, starts_at)
+    group = np.repeat(np.arange(len(starts_at)), np.diff(np.r_[starts_at, len(level)]))
+    hits = np.flatnonzero(level == peaks[group])
+    first_hits = hits[np.r_[True, group[hits][1:] != group[hits][:-1]]]
+    return owners[starts_at], peaks, times[first_hits]
+
+
+def render(occupancy, peak_names, peak_counts, title):
+    fig = Figure(figsize=(10, 7), layout="constrained")
+    heat_ax, peak_ax = fig.subplots(2, 1, height_ratios=(3, 2))
+
+    image = heat_ax.imshow(occupancy, aspect="auto", cmap="magma", interpolation="nearest")
+    heat_ax.set_title(title)
+    heat_ax.set_yticks(range(7), DAYS)
+    heat_ax.set_xticks(range(0, 24, 2), [f"{hour:02d}" for hour in range(0, 24, 2)])
+    heat_ax.set_xlabel("Hour (UTC)")
+    fig.colorbar(image, ax=heat_ax, label="People in voice (avg)")
+
+    if len(peak_names):
+        peak_ax.barh(peak_names[::-1], peak_counts[::-1], color="#c774e8")
+        peak_ax.xaxis.get_major_locator().set_params(integer=True)
+    peak_ax.set_title("Peak concurrent members per channel")
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=100)
+    return buffer.getvalue()
+
+
+def activity_report(db_path, guild_id, since, until, title, top=10):
+    """Everything .vcactivity shows, computed in a worker process.
+
+    Returns a dict with the PNG, the session count, the busiest hour of the
+    week and the top channels by peak concurrency.
+    """
+    channel_names, channels, starts, ends = load_sessions(db_path, guild_id, since, until)
+    if not len(starts):
+        return {"sessions": 0}
+
+    occupancy = hour_of_week_occupancy(starts, ends, since, until)
+    owners, peaks, peak_times = peak_concurrency(channels, starts, ends)
+    ranked = np.argsort(-peaks, kind="stable")[:top]
+    names = channel_names[owners[ranked]]
+
+    day, hour = np.unravel_index(np.argmax(occupancy), occupancy.shape)
+    return {
+        "sessions": len(starts),
+        "busiest": (DAYS[day], int(hour), float(occupancy[day, hour])),
+        "peaks": [(str(name), int(peak), int(at)) for name, peak, at in zip(names, peaks[ranked], peak_times[ranked])],
+        "png": render(occupancy, names, peaks[ranked], title),
+    }
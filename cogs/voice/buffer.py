@@ -0,0 +1,215 @@
+import asyncio
+
+
+def _add(records, key, seconds, sessions, first_seen, last_seen):
+    record = records.get(key)
+    if record is None:
+        records[key] = [seconds, sessions, first_seen, last_seen]
+        return
+    record[0] += seconds
+    record[1] += sessions
+    record[2] = min(record[2], first_seen)
+    record[3] = max(record[3], last_seen)
+
+
+# Rollup tables and their bucket size in seconds.
+BUCKETS = {"vc_hourly": 3600, "vc_daily": 86400}
+
+
+def split(start_time, end_time, duration, size):
+    """Spread a session over the fixed-size time buckets it overlaps.
+
+    Yields (bucket start, seconds); the session itself counts in the first.
+    """
+    length = end_time - start_time
+    bucket = start_time - start_time % size
+    if length <= 0:
+        yield bucket, duration
+        return
+    while bucket < end_time:
+        overlap = min(end_time, bucket + size) - max(start_time, bucket)
+        yield bucket, duration * overlap / length
+        bucket += size
+
+
+# Shared tail of the vc_totals and vc_users upserts.
+TOTALS_UPDATE = """
+    total_seconds = total_seconds + excluded.total_seconds,
+    sessions = sessions + excluded.sessions,
+    first_seen = MIN(COALESCE(first_seen, excluded.first_seen), excluded.first_seen),
+    last_seen = MAX(COALESCE(last_seen, excluded.last_seen), excluded.last_seen)
+"""
+
+
+class VCWriteBuffer:
+    """Voice-tracking writes held in memory and written in one transaction.
+
+    Nothing here touches the database until flush(), which the tracker calls
+    every few seconds, when `max_pending` writes have piled up, and on unload.
+    Reads that combine the database with pending_for() hold `lock`, so a
+    flush can't move rows between the two halfway through.
+    """
+
+    AVERAGE_TABLES = ("response_times", "wait_logs")
+
+    def __init__(self, db, max_pending=200):
+        self.db = db
+        self.max_pending = max_pending
+        self.lock = asyncio.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.sessions = []
+        # Aggregates, each [seconds, sessions, first_seen, last_seen], keyed by
+        # (user_id, vc_channel), (guild_id, user_id) and user_id.
+        self.channels = {}
+        self.totals = {}
+        self.users = {}
+        # (table, guild_id, user_id, vc_channel, bucket) -> [seconds, sessions]
+        self.buckets = {}
+        # table -> user_id -> [sum, count]
+        self.averages = {table: {} for table in self.AVERAGE_TABLES}
+        self.switches = []
+        # (guild_id, member_id) of sessions closed since the last flush, to
+        # drop from the open sessions journal.
+        self.closed = set()
+
+    def _pending(self):
+        return self.sessions, self.channels, self.totals, self.users, self.buckets, self.averages, self.switches, self.closed
+
+    def __len__(self):
+        return len(self.sessions) + len(self.switches) + sum(len(users) for users in self.averages.values())
+
+    def add_session(self, guild_id, user_id, vc_channel, start_time, end_time, duration):
+        self.sessions.append((user_id, vc_channel, start_time, end_time, duration, guild_id))
+        self.closed.add((guild_id, int(user_id)))
+        _add(self.channels, (user_id, vc_channel), duration, 1, start_time, end_time)
+        _add(self.totals, (guild_id, user_id), duration, 1, start_time, end_time)
+        _add(self.users, user_id, duration, 1, start_time, end_time)
+        for table, size in BUCKETS.items():
+            for i, (bucket, seconds) in enumerate(split(start_time, end_time, duration, size)):
+                totals = self.buckets.setdefault((table, guild_id, user_id, vc_channel, bucket), [0.0, 0])
+                totals[0] += seconds
+                totals[1] += int(i == 0)
+
+    def add_average(self, table, user_id, value):
+        totals = self.averages[table].setdefault(user_id, [0.0, 0])
+        totals[0] += value
+        totals[1] += 1
+
+    def add_switch(self, user_id, from_vc, to_vc, timestamp):
+        self.switches.append((user_id, from_vc, to_vc, timestamp))
+
+    def discard(self, user_id):
+        """Drop everything pending for a user, e.g. when they reset their stats."""
+        self.sessions = [row for row in self.sessions if row[0] != user_id]
+        self.channels = {key: value for key, value in self.channels.items() if key[0] != user_id}
+        self.totals = {key: value for key, value in self.totals.items() if key[1] != user_id}
+        self.users.pop(user_id, None)
+        self.buckets = {key: value for key, value in self.buckets.items() if key[2] != user_id}
+        for users in self.averages.values():
+            users.pop(user_id, None)
+        self.switches = [row for row in self.switches if row[0] != user_id]
+
+    def pending_for(self, user_id):
+        """What is still unflushed for one user, for reads that must include it."""
+        return {
+            "user": self.users.get(user_id),
+            "guilds": {key[0]: value for key, value in self.totals.items() if key[1] == user_id},
+            "channels": {key[1]: value for key, value in self.channels.items() if key[0] == user_id},
+            "averages": {table: users.get(user_id) for table, users in self.averages.items()},
+            "switches": [row for row in self.switches if row[0] == user_id],
+        }
+
+    async def flush(self, checkpoint=None):
+        """Write everything out.
+
+        `checkpoint` returns the open sessions, as (guild_id, member_id,
+        channel_id, join_time, seen_at) rows, to journal in the same
+        transaction. It's called at the same moment the buffer is emptied, so
+        the journal can't disagree with the sessions written.
+        """
+        # Checked under the lock: while another flush is mid-transaction the
+        # buffer is empty, but its rows aren't readable yet.
+        async with self.lock:
+            if not len(self) and not checkpoint:
+                return
+            pending = self._pending()
+            sessions, channels, totals, users, buckets, averages, switches, closed = pending
+            self._reset()
+            open_sessions = checkpoint() if checkpoint else None
+            try:
+                async with self.db.transaction() as conn:
+                    await conn.executemany("""
+                        INSERT INTO sessions (user_id, vc_channel, start_time, end_time, duration_seconds, guild_id)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    """, sessions)
+                    await conn.executemany("""
+                        INSERT INTO vc_channels (user_id, vc_channel, total_seconds, sessions) VALUES (?, ?, ?, ?)
+                        ON CONFLICT(user_id, vc_channel) DO UPDATE SET
+                            total_seconds = total_seconds + excluded.total_seconds,
+                            sessions = sessions + excluded.sessions
+                    """, [(user_id, vc_channel, seconds, count) for (user_id, vc_channel), (seconds, count, _, _) in channels.items()])
+                    # Totals for the leaderboard and .vcstats, kept up to date here
+                    # instead of summed from sessions on every read.
+                    await conn.executemany("""
+                        INSERT INTO vc_totals (guild_id, user_id, total_seconds, sessions, first_seen, last_seen)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(guild_id, user_id) DO UPDATE SET
+                    """ + TOTALS_UPDATE, [(*key, *record) for key, record in totals.items()])
+                    await conn.executemany("""
+                        INSERT INTO vc_users (user_id, total_seconds, sessions, first_seen, last_seen)
+                        VALUES (?, ?, ?, ?, ?)
+                        ON CONFLICT(user_id) DO UPDATE SET
+                    """ + TOTALS_UPDATE, [(user_id, *record) for user_id, record in users.items()])
+                    for table in BUCKETS:
+                        await conn.executemany(f"""
+                            INSERT INTO {table} (guild_id, user_id, vc_channel, bucket, seconds, sessions)
+                            VALUES (?, ?, ?, ?, ?, ?)
+                            ON CONFLICT(guild_id, user_id, vc_channel, bucket) DO UPDATE SET
+                                seconds = seconds + excluded.seconds,
+                                sessions = sessions + excluded.sessions
+                        """, [(*key[1:], seconds, count) for key, (seconds, count) in buckets.items() if key[0] == table])
+                    for table, averaged in averages.items():
+                        # Upserts, so cluster processes sharing the file can't lose updates.
+                        await conn.executemany(f"""
+                            INSERT INTO {table} (user_id, average, count) VALUES (?, ?, ?)
+                            ON CONFLICT(user_id) DO UPDATE SET
+                                average = (average * count + excluded.average * excluded.count) / (count + excluded.count),
+                                count = count + excluded.count
+                        """, [(user_id, total / count, count) for user_id, (total, count) in averaged.items()])
+                    await conn.executemany("""
+                        INSERT INTO switch_logs (user_id, from_vc, to_vc, timestamp) VALUES (?, ?, ?, ?)
+                    """, switches)
+                    await conn.executemany("DELETE FROM vc_open_sessions WHERE guild_id = ? AND member_id = ?", closed)
+                    if open_sessions:
+                        await conn.executemany("""
+                            INSERT INTO vc_open_sessions (guild_id, member_id, channel_id, join_time, seen_at)
+                            VALUES (?, ?, ?, ?, ?)
+                            ON CONFLICT(guild_id, member_id) DO UPDATE SET
+                                channel_id = excluded.channel_id,
+                                join_time = excluded.join_time,
+                                seen_at = excluded.seen_at
+                        """, open_sessions)
+            except Exception:
+                # Put everything back in front of whatever arrived meanwhile.
+                (newer_sessions, newer_channels, newer_totals, newer_users, newer_buckets,
+                 newer_averages, newer_switches, newer_closed) = self._pending()
+                (self.sessions, self.channels, self.totals, self.users, self.buckets,
+                 self.averages, self.switches, self.closed) = pending
+                self.sessions += newer_sessions
+                self.switches += newer_switches
+                self.closed |= newer_closed
+                for records, newer in ((self.channels, newer_channels), (self.totals, newer_totals), (self.users, newer_users)):
+                    for key, record in newer.items():
+                        _add(records, key, *record)
+                for key, (seconds, count) in newer_buckets.items():
+                    totals = self.buckets.setdefault(key, [0.0, 0])
+                    totals[0] += seconds
+                    totals[1] += count
+                for table, newer in newer_averages.items():
+                    for user_id, (total, count) in newer.items():
+                        totals = self.averages[table].setdefault(user_id, [0.0, 0])
+                        totals[0] += total
+                        totals[1] += count
+                raise
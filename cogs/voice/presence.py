@@ -0,0 +1,89 @@
+class VoiceSession:
+    __slots__ = ("join", "guild_id", "channel_id", "waiting", "wait_start")
+
+    def __init__(self, join, guild_id, channel_id):
+        self.join = join
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.waiting = True
+        self.wait_start = join
+
+
+class PresenceIndex:
+    """Who is in which voice channel, by member and by channel.
+
+    IDs are ints as Discord hands them over. Each channel also keeps the set
+    of members still waiting for a response, so a mute or deafen toggle only
+    looks at its own channel, and once that set is empty further toggles in
+    the channel cost a single lookup.
+    """
+
+    def __init__(self):
+        self.sessions = {}
+        self.by_channel = {}
+        self.waiting = {}
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def get(self, member_id):
+        return self.sessions.get(member_id)
+
+    def join(self, member_id, guild_id, channel_id, now):
+        self.leave(member_id)
+        session = self.sessions[member_id] = VoiceSession(now, guild_id, channel_id)
+        self.by_channel.setdefault(channel_id, set()).add(member_id)
+        self.waiting.setdefault(channel_id, set()).add(member_id)
+        return session
+
+    def leave(self, member_id):
+        session = self.sessions.pop(member_id, None)
+        if session is None:
+            return None
+        for index in (self.by_channel, self.waiting):
+            members = index.get(session.channel_id)
+            if members is not None:
+                members.discard(member_id)
+                if not members:
+                    del index[session.channel_id]
+        return session
+
+    def adopt(self, member_id, guild_id, channel_id, join):
+        """Track someone found already in voice, e.g. at startup.
+
+        Nobody knows how long they've been waiting, so they aren't.
+        """
+        session = self.join(member_id, guild_id, channel_id, join)
+        session.waiting = False
+        self.waiting[channel_id].discard(member_id)
+        if not self.waiting[channel_id]:
+            del self.waiting[channel_id]
+        return session
+
+    def restore(self, member_id, guild_id, channel_id, join, waiting, wait_start):
+        """Track a session handed over from a reloaded cog, as it was."""
+        session = self.adopt(member_id, guild_id, channel_id, join)
+        session.wait_start = wait_start
+        if waiting:
+            session.waiting = True
+            self.waiting.setdefault(channel_id, set()).add(member_id)
+        return session
+
+    def respond(self, channel_id, member_id, now):
+        """Stop the wait of everyone else in the channel.
+
+        Returns (member_id, seconds waited) for each member that was waiting.
+        """
+        waiting = self.waiting.get(channel_id)
+        if not waiting or (len(waiting) == 1 and member_id in waiting):
+            return []
+        responded = []
+        for other_id in waiting - {member_id}:
+            session = self.sessions[other_id]
+            session.waiting = False
+            responded.append((other_id, (now - session.wait_start).total_seconds()))
+        if member_id in waiting:
+            self.waiting[channel_id] = {member_id}
+        else:
+            del self.waiting[channel_id]
+        return responded
@@ -0,0 +1,713 @@
+import discord
+from discord.ext import commands, tasks
+from discord.ui import View, Button
+import asyncio
+import io
+import multiprocessing
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Literal, Optional
+from utils.migrations import epoch, open_migrated, rebuild
+from .buffer import BUCKETS, VCWriteBuffer
+from .presence import PresenceIndex
+
+DB_FILE = "./Databases/vc_tracking.db"
+# Seconds a cached .vcstats record is trusted, for sessions written by
+# other cluster processes.
+STATS_TTL = 60
+STATS_CACHE_SIZE = 1000
+# Open sessions are journaled every this many buffer flushes (5s each).
+CHECKPOINT_EVERY = 12
+# Days covered by each .vcstats period other than "all".
+PERIODS = {"week": 7, "month": 30}
+# Raw sessions and switches, and hourly rollups, are deleted after this many
+# days. Daily rollups are kept. Periods start with hourly buckets, so those
+# are kept at least as long as the longest period.
+RAW_RETENTION_DAYS = int(os.getenv("VC_RAW_RETENTION_DAYS", "30"))
+HOURLY_RETENTION_DAYS = max(int(os.getenv("VC_HOURLY_RETENTION_DAYS", "90")), max(PERIODS.values()) + 1)
+RETENTION_BATCH = 5000
+# A period's rollup rows: hourly buckets up to its first midnight, daily ones
+# after that. Both tables have the same columns.
+PERIOD_ROWS = """
+    SELECT * FROM vc_hourly WHERE {key} = ? AND bucket >= ? AND bucket < ?
+    UNION ALL
+    SELECT * FROM vc_daily WHERE {key} = ? AND bucket >= ?
+"""
+
+SESSIONS_TABLE = """
+    CREATE TABLE sessions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id TEXT NOT NULL,
+        vc_channel TEXT NOT NULL,
+        start_time INTEGER NOT NULL,
+        end_time INTEGER NOT NULL,
+        duration_seconds REAL NOT NULL
+    )
+"""
+SWITCH_LOGS_TABLE = """
+    CREATE TABLE switch_logs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id TEXT NOT NULL,
+        from_vc TEXT NOT NULL,
+        to_vc TEXT NOT NULL,
+        timestamp INTEGER NOT NULL
+    )
+"""
+
+MIGRATIONS = [
+    # 1: the original schema, with ISO text timestamps.
+    (
+        """CREATE TABLE IF NOT EXISTS sessions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            vc_channel TEXT NOT NULL,
+            start_time TEXT NOT NULL,
+            end_time TEXT NOT NULL,
+            duration_seconds REAL NOT NULL
+        )""",
+        """CREATE TABLE IF NOT EXISTS response_times (
+            user_id TEXT PRIMARY KEY,
+            average REAL NOT NULL,
+            count INTEGER NOT NULL
+        )""",
+        """CREATE TABLE IF NOT EXISTS wait_logs (
+            user_id TEXT PRIMARY KEY,
+            average REAL NOT NULL,
+            count INTEGER NOT NULL
+        )""",
+        """CREATE TABLE IF NOT EXISTS switch_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            from_vc TEXT NOT NULL,
+            to_vc TEXT NOT NULL,
+            timestamp TEXT NOT NULL
+        )""",
+        """CREATE TABLE IF NOT EXISTS vc_channels (
+            user_id TEXT NOT NULL,
+            vc_channel TEXT NOT NULL,
+            total_seconds REAL NOT NULL,
+            sessions INTEGER NOT NULL,
+            PRIMARY KEY (user_id, vc_channel)
+        )""",
+    ),
+    # 2: timestamps as epoch seconds.
+    rebuild("sessions", SESSIONS_TABLE.strip(),
+            f"id, user_id, vc_channel, {epoch('start_time')}, {epoch('end_time')}, duration_seconds")
+    + rebuild("switch_logs", SWITCH_LOGS_TABLE.strip(),
+              f"id, user_id, from_vc, to_vc, {epoch('timestamp')}"),
+    # 3: indexes for .vcstats.
+    (
+        "CREATE INDEX sessions_user ON sessions (user_id)",
+        "CREATE INDEX switch_logs_user_time ON switch_logs (user_id, timestamp)",
+    ),
+    # 4: per-guild leaderboards. Older sessions don't know their guild, so
+    # they stay out of the totals.
+    (
+        "ALTER TABLE sessions ADD COLUMN guild_id INTEGER",
+        """CREATE TABLE vc_totals (
+            guild_id INTEGER NOT NULL,
+            user_id TEXT NOT NULL,
+            total_seconds REAL NOT NULL,
+            sessions INTEGER NOT NULL,
+            PRIMARY KEY (guild_id, user_id)
+        )""",
+        "CREATE INDEX vc_totals_rank ON vc_totals (guild_id, total_seconds DESC)",
+    ),
+    # 5: per-user totals, so .vcstats doesn't scan sessions.
+    (
+        "ALTER TABLE vc_totals ADD COLUMN first_seen INTEGER",
+        "ALTER TABLE vc_totals ADD COLUMN last_seen INTEGER",
+        """UPDATE vc_totals SET
+            first_seen = (SELECT MIN(start_time) FROM sessions s WHERE s.guild_id = vc_totals.guild_id AND s.user_id = vc_totals.user_id),
+            last_seen = (SELECT MAX(end_time) FROM sessions s WHERE s.guild_id = vc_totals.guild_id AND s.user_id = vc_totals.user_id)""",
+        """CREATE TABLE vc_users (
+            user_id TEXT PRIMARY KEY,
+            total_seconds REAL NOT NULL,
+            sessions INTEGER NOT NULL,
+            first_seen INTEGER,
+            last_seen INTEGER
+        )""",
+        """INSERT INTO vc_users
+            SELECT user_id, SUM(duration_seconds), COUNT(*), MIN(start_time), MAX(end_time)
+            FROM sessions GROUP BY user_id""",
+    ),
+    # 6: journal of open sessions, so restarts don't lose them.
+    (
+        """CREATE TABLE vc_open_sessions (
+            guild_id INTEGER NOT NULL,
+            member_id INTEGER NOT NULL,
+            channel_id INTEGER NOT NULL,
+            join_time INTEGER NOT NULL,
+            seen_at INTEGER NOT NULL,
+            PRIMARY KEY (guild_id, member_id)
+        )""",
+    ),
+    # 7: hourly and daily rollups, so time ranges don't read raw sessions and
+    # those can expire. Sessions without a guild go in guild 0; existing ones
+    # count in the bucket they started in.
+    tuple(
+        statement
+        for table, size in BUCKETS.items()
+        for statement in (
+            f"""CREATE TABLE {table} (
+                guild_id INTEGER NOT NULL,
+                user_id TEXT NOT NULL,
+                vc_channel TEXT NOT NULL,
+                bucket INTEGER NOT NULL,
+                seconds REAL NOT NULL,
+                sessions INTEGER NOT NULL,
+                PRIMARY KEY (guild_id, user_id, vc_channel, bucket)
+            )""",
+            f"""INSERT INTO {table}
+                SELECT COALESCE(guild_id, 0), user_id, vc_channel, start_time - start_time % {size},
+                       SUM(duration_seconds), COUNT(*)
+                FROM sessions GROUP BY 1, 2, 3, 4""",
+            f"CREATE INDEX {table}_user ON {table} (user_id, bucket)",
+            f"CREATE INDEX {table}_guild ON {table} (guild_id, bucket)",
+        )
+    ) + (
+        # For retention.
+        "CREATE INDEX sessions_end ON sessions (end_time)",
+        "CREATE INDEX switch_logs_time ON switch_logs (timestamp)",
+    ),
+    # 8: .vcactivity loads a guild's sessions by time.
+    ("CREATE INDEX sessions_guild_end ON sessions (guild_id, end_time)",),
+    # 9: for hourly rollup retention.
+    ("CREATE INDEX vc_hourly_bucket ON vc_hourly (bucket)",),
+]
+
+
+def to_epoch(dt):
+    # Times are naive UTC from datetime.utcnow().
+    return int(dt.replace(tzinfo=timezone.utc).timestamp())
+
+
+def _activity_report(*args):
+    # Runs in the analytics worker, so NumPy and matplotlib are only ever
+    # imported there and not in the bot process.
+    from .analytics import activity_report
+    return activity_report(*args)
+
+
+def period_start(days):
+    """Start of the last `days` days, in whole hours including this one.
+
+    Returns (start, first midnight at or after it), where the period
+    switches from hourly to daily rollups.
+    """
+    now = to_epoch(datetime.utcnow())
+    start = now - now % 3600 - (days * 24 - 1) * 3600
+    return start, start + (-start) % 86400
+
+
+class VCTracker(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.db = None
+        self.buffer = None
+
+        self.presence = PresenceIndex()
+        self.wait_trackers = {}
+        self.reconcile_task = None
+        self.flush_task = None
+        self.handed_over = False
+        self.analytics_pool = None
+        # user_id -> (loaded_at, stats) for .vcstats
+        self.stats_cache = {}
+
+    def export_state(self):
+        # Plain data only: objects would keep the old module's classes, and
+        # with them the code the reload was meant to replace.
+        presence = [
+            (member_id, session.guild_id, session.channel_id, session.join, session.waiting, session.wait_start)
+            for member_id, session in self.presence.sessions.items()
+        ]
+        return {"presence": presence, "wait_trackers": self.wait_trackers}
+
+    def import_state(self, state):
+        # The old cog was tracking everyone already, nothing to reconcile.
+        self.handed_over = True
+        self.presence = PresenceIndex()
+        for row in state["presence"]:
+            self.presence.restore(*row)
+        self.wait_trackers.update(state["wait_trackers"])
+
+    async def cog_load(self):
+        self.db = await open_migrated(DB_FILE, MIGRATIONS)
+        # Voice events only touch memory; the buffer is written out in one
+        # transaction every few seconds or once enough has piled up.
+        self.buffer = VCWriteBuffer(self.db)
+        self.flush_buffer.start()
+        self.reconcile_task = asyncio.create_task(self.reconcile())
+        # Only one cluster process should run bot-wide background loops.
+        if self.bot.is_leader:
+            self.apply_retention.start()
+
+    async def cog_unload(self):
+        self.flush_buffer.cancel()
+        self.apply_retention.cancel()
+        if self.reconcile_task is not None:
+            self.reconcile_task.cancel()
+        await self.buffer.flush(self.checkpoint)
+        if self.analytics_pool is not None:
+            self.analytics_pool.shutdown(wait=False, cancel_futures=True)
+
+    def checkpoint(self):
+        seen_at = to_epoch(datetime.utcnow())
+        return [
+            (session.guild_id, member_id, session.channel_id, to_epoch(session.join), seen_at)
+            for member_id, session in self.presence.sessions.items()
+        ]
+
+    @tasks.loop(seconds=5)
+    async def flush_buffer(self):
+        # Ended sessions leave the journal with every flush; open ones are
+        # rewritten in one batch every minute.
+        checkpoint = self.checkpoint if self.flush_buffer.current_loop % CHECKPOINT_EVERY == 0 else None
+        await self.write_out(checkpoint)
+
+    async def write_out(self, checkpoint=None):
+        # A failed flush keeps its rows in the buffer for the next one.
+        try:
+            await self.buffer.flush(checkpoint)
+        except Exception:
+            traceback.print_exc()
+
+    @tasks.loop(hours=1)
+    async def apply_retention(self):
+        now = to_epoch(datetime.utcnow())
+        raw_cutoff = now - RAW_RETENTION_DAYS * 86400
+        try:
+            deleted = {
+                "sessions": await self.delete_before("sessions", "end_time", raw_cutoff),
+                "switch_logs": await self.delete_before("switch_logs", "timestamp", raw_cutoff),
+                "vc_hourly": await self.delete_before("vc_hourly", "bucket", now - HOURLY_RETENTION_DAYS * 86400),
+            }
+        except Exception:
+            traceback.print_exc()
+            return
+        if any(deleted.values()):
+            print("Expired VC history: " + ", ".join(f"{count} {table}" for table, count in deleted.items()))
+
+    async def delete_before(self, table, column, cutoff):
+        # Small batches, so voice flushes don't wait behind one huge delete.
+        deleted = 0
+        while True:
+            count = await self.db.execute(f"""
+                DELETE FROM {table} WHERE rowid IN (
+                    SELECT rowid FROM {table} WHERE {column} < ? LIMIT {RETENTION_BATCH}
+                )
+            """, (cutoff,))
+            deleted += count
+            if count < RETENTION_BATCH:
+                return deleted
+
+    async def reconcile(self):
+        """Match the journal of open sessions against who is in voice now.
+
+        Journaled sessions whose member is gone, or in another channel, are
+        closed at the last checkpoint. Everyone in voice is tracked, keeping
+        their journaled join time if they never left the channel. Rows for
+        guilds the bot has left are dropped.
+        """
+        await self.bot.wait_until_ready()
+        rows = await self.db.fetchall("SELECT guild_id, member_id, channel_id, join_time, seen_at FROM vc_open_sessions")
+        if self.handed_over:
+            return
+
+        journal = {(r["guild_id"], r["member_id"]): r for r in rows}
+        now = datetime.utcnow()
+        adopted = closed = 0
+        for guild in self.bot.guilds:
+            for channel in guild.voice_channels + guild.stage_channels:
+                for member_id in channel.voice_states:
+                    if self.presence.get(member_id) is not None:
+                        continue  # Joined since we came up.
+                    row = journal.pop((guild.id, member_id), None)
+                    join = now
+                    if row is not None and row["channel_id"] == channel.id:
+                        join = datetime.utcfromtimestamp(row["join_time"])
+                    elif row is not None:
+                        journal[(guild.id, member_id)] = row
+                    self.presence.adopt(member_id, guild.id, channel.id, join)
+                    adopted += 1
+
+        left = []
+        for (guild_id, member_id), row in journal.items():
+            if self.bot.get_guild(guild_id) is None:
+                # Guilds on our own shards that we can't see are ones we've
+                # left; the rest belong to another cluster process.
+                if (guild_id >> 22) % (self.bot.shard_count or 1) in self.bot.shards:
+                    left.append((guild_id, member_id))
+                continue
+            channel = self.bot.get_channel(row["channel_id"])
+            self.buffer.add_session(
+                guild_id, str(member_id), channel.name if channel else "Unknown",
+                row["join_time"], row["seen_at"], max(0, row["seen_at"] - row["join_time"])
+            )
+            self.invalidate(str(member_id))
+            closed += 1
+        if left:
+            await self.db.executemany("DELETE FROM vc_open_sessions WHERE guild_id = ? AND member_id = ?", left)
+        self.buffered()
+        print(f"Reconciled voice sessions: {adopted} in voice, {closed} closed while offline, {len(left)} dropped from left guilds")
+
+    def invalidate(self, user_id):
+        self.stats_cache.pop(user_id, None)
+
+    def buffered(self):
+        # Flush early after a burst, e.g. everyone leaving at the end of an event.
+        if len(self.buffer) >= self.buffer.max_pending and (self.flush_task is None or self.flush_task.done()):
+            self.flush_task = asyncio.create_task(self.write_out())
+
+    @commands.Cog.listener()
+    async def on_voice_state_update(self, member, before, after):
+        user_id = str(member.id)
+
+        if before.channel is None and after.channel is not None:
+            now = datetime.utcnow()
+            self.presence.join(member.id, member.guild.id, after.channel.id, now)
+
+            vc = after.channel
+            if len(vc.members) == 1:
+                self.wait_trackers[vc.id] = {
+                    "start": now,
+                    "user": user_id
+                }
+            elif len(vc.members) == 2 and vc.id in self.wait_trackers:
+                wait_data = self.wait_trackers.pop(vc.id)
+                elapsed = (now - wait_data["start"]).total_seconds()
+                self.buffer.add_average("wait_logs", wait_data["user"], elapsed)
+                self.invalidate(wait_data["user"])
+                self.buffered()
+
+        elif before.channel is not None and after.channel is None:
+            await self.handle_vc_leave(member, before.channel)
+
+        elif before.channel is not None and after.channel is not None and before.channel.id != after.channel.id:
+            await self.handle_vc_leave(member, before.channel)
+
+            now = datetime.utcnow()
+            self.presence.join(member.id, member.guild.id, after.channel.id, now)
+
+            self.buffer.add_switch(user_id, before.channel.name, after.channel.name, to_epoch(now))
+            self.invalidate(user_id)
+            self.buffered()
+
+        elif before.channel == after.channel:
+            # Mute, deafen and stream toggles. Only members of this channel who
+            # are still waiting are touched, so a burst of toggles costs one
+            # set lookup each after the first.
+            responded = self.presence.respond(after.channel.id, member.id, datetime.utcnow())
+            for other_id, response_time in responded:
+                self.buffer.add_average("response_times", str(other_id), response_time)
+            if responded:
+                self.buffered()
+
+    async def handle_vc_leave(self, member, vc):
+        user_id = str(member.id)
+        session = self.presence.leave(member.id)
+        if session is None:
+            return
+
+        if vc and len(vc.members) == 0 and vc.id in self.wait_trackers:
+            del self.wait_trackers[vc.id]
+
+        start_time = session.join
+        end_time = datetime.utcnow()
+        duration = (end_time - start_time).total_seconds()
+        vc_channel_name = vc.name if vc else "Unknown"
+
+        self.buffer.add_session(member.guild.id, user_id, vc_channel_name, to_epoch(start_time), to_epoch(end_time), duration)
+        self.invalidate(user_id)
+        self.buffered()
+
+    async def user_stats(self, user_id):
+        """A user's aggregated VC stats, from the totals tables and the buffer.
+
+        Cached until the user's next session, switch or wait time is recorded.
+        Flushing doesn't change the sums, so it doesn't invalidate anything.
+        """
+        cached = self.stats_cache.get(user_id)
+        if cached is not None and time.monotonic() - cached[0] < STATS_TTL:
+            return cached[1]
+
+        async with self.buffer.lock:
+            row = await self.db.fetchone(
+                "SELECT total_seconds, sessions, first_seen, last_seen FROM vc_users WHERE user_id = ?", (user_id,)
+            )
+            guild_rows = await self.db.fetchall("SELECT guild_id, total_seconds, sessions FROM vc_totals WHERE user_id = ?", (user_id,))
+            wait_row = await self.db.fetchone("SELECT average, count FROM wait_logs WHERE user_id = ?", (user_id,))
+            channel_rows = await self.db.fetchall(
+                "SELECT vc_channel, total_seconds, sessions FROM vc_channels WHERE user_id = ?", (user_id,)
+            )
+            switch_logs = await self.db.fetchall(
+                "SELECT from_vc, to_vc, timestamp FROM switch_logs WHERE user_id = ? ORDER BY timestamp DESC LIMIT 5", (user_id,)
+            )
+            # Nothing is flushed while the lock is held, but sessions can still
+            # end during the queries, so the buffer is read last.
+            pending = self.buffer.pending_for(user_id)
+
+        user = list(row) if row else None
+        if pending["user"]:
+            user = pending["user"] if user is None else [
+                user[0] + pending["user"][0],
+                user[1] + pending["user"][1],
+                min(user[2] or pending["user"][2], pending["user"][2]),
+                max(user[3] or pending["user"][3], pending["user"][3]),
+            ]
+
+        guilds = {r["guild_id"]: [r["total_seconds"], r["sessions"]] for r in guild_rows}
+        for guild_id, (seconds, count, _, _) in pending["guilds"].items():
+            totals = guilds.setdefault(guild_id, [0.0, 0])
+            totals[0] += seconds
+            totals[1] += count
+
+        wait_total, wait_count = pending["averages"]["wait_logs"] or (0.0, 0)
+        if wait_row:
+            wait_total += wait_row["average"] * wait_row["count"]
+            wait_count += wait_row["count"]
+
+        channels = {r["vc_channel"]: [r["total_seconds"], r["sessions"]] for r in channel_rows}
+        for vc_channel, (seconds, count, _, _) in pending["channels"].items():
+            totals = channels.setdefault(vc_channel, [0.0, 0])
+            totals[0] += seconds
+            totals[1] += count
+
+        switches = [(s["timestamp"], s["from_vc"], s["to_vc"]) for s in reversed(switch_logs)]
+        switches += [(timestamp, from_vc, to_vc) for _, from_vc, to_vc, timestamp in pending["switches"]]
+
+        stats = {
+            "total_seconds": user[0] if user else 0,
+            "sessions": user[1] if user else 0,
+            "first_seen": user[2] if user else None,
+            "last_seen": user[3] if user else None,
+            "guilds": guilds,
+            "wait": (wait_total, wait_count),
+            "channels": channels,
+            "switches": switches[-5:],
+        }
+        if len(self.stats_cache) >= STATS_CACHE_SIZE:
+            self.stats_cache.pop(next(iter(self.stats_cache)))
+        self.stats_cache[user_id] = (time.monotonic(), stats)
+        return stats
+
+    async def period_stats(self, user_id, days):
+        """A user's VC stats over the last `days` days, from the rollups."""
+        start, midnight = period_start(days)
+        async with self.buffer.lock:
+            rows = await self.db.fetchall(f"""
+                SELECT guild_id, vc_channel, SUM(seconds) AS seconds, SUM(sessions) AS sessions
+                FROM ({PERIOD_ROWS.format(key="user_id")})
+                GROUP BY guild_id, vc_channel
+            """, (user_id, start, midnight, user_id, midnight))
+            # Anything still buffered ended moments ago, well inside the period.
+            pending = self.buffer.pending_for(user_id)
+        guilds = {}
+        channels = {}
+        for r in rows:
+            for totals in (guilds.setdefault(r["guild_id"], [0.0, 0]), channels.setdefault(r["vc_channel"], [0.0, 0])):
+                totals[0] += r["seconds"]
+                totals[1] += r["sessions"]
+        for totals, buffered in ((guilds, pending["guilds"]), (channels, pending["channels"])):
+            for key, (seconds, count, _, _) in buffered.items():
+                pair = totals.setdefault(key, [0.0, 0])
+                pair[0] += seconds
+                pair[1] += count
+        return {
+            "total_seconds": sum(seconds for seconds, _ in guilds.values()),
+            "sessions": sum(count for _, count in guilds.values()),
+            "guilds": guilds,
+            "channels": channels,
+        }
+
+    @commands.command(name="vcstats", aliases=["vct", "vcs"])
+    async def vc_stats(self, ctx, member: Optional[discord.Member] = None, period: Literal["week", "month", "all"] = "all"):
+        if member is None:
+            member = ctx.author
+
+        if period == "all":
+            stats = await self.user_stats(str(member.id))
+            title = f"VC Stats for {member.display_name}"
+        else:
+            stats = await self.period_stats(str(member.id), PERIODS[period])
+            title = f"VC Stats for {member.display_name} (last {PERIODS[period]} days)"
+        total = str(timedelta(seconds=int(stats["total_seconds"])))
+
+        embed = discord.Embed(
+            title=title,
+            color=discord.Color.purple()
+        )
+        embed.add_field(name="Total VC Time", value=total, inline=False)
+        guild_seconds, guild_sessions = stats["guilds"].get(ctx.guild.id, (0, 0))
+        embed.add_field(
+            name="In This Server",
+            value=f"{timedelta(seconds=int(guild_seconds))} over {guild_sessions} sessions",
+            inline=False
+        )
+        if "wait" in stats:
+            wait_total, wait_count = stats["wait"]
+            avg_wait = f"{wait_total / wait_count:.2f} seconds" if wait_count > 0 else "No wait time data"
+            embed.add_field(name="Avg Time Until Someone Joined", value=avg_wait, inline=False)
+        embed.add_field(name="Sessions Tracked", value=str(stats["sessions"]), inline=False)
+        if stats.get("first_seen") is not None:
+            embed.add_field(
+                name="First / Last Seen in VC",
+                value=f"<t:{stats['first_seen']}:D> / <t:{stats['last_seen']}:R>",
+                inline=False
+            )
+
+        if stats["channels"]:
+            vc_lines = []
+            for vc_channel, (seconds, count) in stats["channels"].items():
+                avg = seconds / count
+                vc_lines.append(f"**{vc_channel}**: {timedelta(seconds=int(avg))} avg over {count} sessions")
+            embed.add_field(name="VC Time per Channel", value="\n".join(vc_lines), inline=False)
+
+        if stats.get("switches"):
+            switch_lines = [f"<t:{timestamp}:f>: {from_vc} → {to_vc}" for timestamp, from_vc, to_vc in stats["switches"]]
+            embed.add_field(name="Recent VC Switches", value="\n".join(switch_lines), inline=False)
+
+        view = VCStatsView(self, ctx.author.id, member, period)
+        await ctx.send(embed=embed, view=view)
+
+
+    @commands.command(name="vcactivity", aliases=["vca"])
+    @commands.cooldown(1, 30, commands.BucketType.guild)
+    async def vc_activity(self, ctx, period: Literal["week", "month"] = "month"):
+        """When this server's voice channels are busiest, and how full they get"""
+        await self.buffer.flush()
+        days = PERIODS[period]
+        if self.analytics_pool is None:
+            # Spawned rather than forked: forking a process that has threads
+            # running (aiosqlite's) isn't safe.
+            self.analytics_pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        try:
+            async with ctx.typing():
+                report = await asyncio.get_running_loop().run_in_executor(
+                    self.analytics_pool, _activity_report, self.db.path, ctx.guild.id,
+                    period_start(days)[0], to_epoch(datetime.utcnow()), f"{ctx.guild.name}: last {days} days"
+                )
+        except Exception:
+            traceback.print_exc()
+            return await ctx.send("Couldn't crunch the voice stats right now, nya~ Please try again later!")
+
+        if not report["sessions"]:
+            return await ctx.send(f"No voice sessions recorded here in the last {days} days, nya~")
+
+        day, hour, average = report["busiest"]
+        embed = discord.Embed(
+            title=f"VC Activity for the Last {days} Days",
+            color=discord.Color.purple()
+        )
+        embed.add_field(name="Sessions", value=str(report["sessions"]), inline=False)
+        embed.add_field(
+            name="Busiest Hour",
+            value=f"{day} {hour:02d}:00–{(hour + 1) % 24:02d}:00 UTC, {average:.1f} people on average",
+            inline=False
+        )
+        peak_lines = [f"**{name}**: {peak} at <t:{at}:f>" for name, peak, at in report["peaks"][:5]]
+        embed.add_field(name="Peak Concurrency", value="\n".join(peak_lines), inline=False)
+        embed.set_image(url="attachment://vc_activity.png")
+        await ctx.send(embed=embed, file=discord.File(io.BytesIO(report["png"]), filename="vc_activity.png"))
+
+
+class VCStatsView(View):
+    def __init__(self, cog: VCTracker, requester_id: int, target_member: discord.Member, period: str = "all"):
+        super().__init__()
+        self.cog = cog
+        self.requester_id = requester_id
+        self.target_member = target_member
+
+        if requester_id == target_member.id:
+            self.add_item(VCResetButton(cog, target_member.id))
+
+        self.add_item(VCLeaderboardButton(cog, period))
+
+
+class VCResetButton(Button):
+    def __init__(self, cog: VCTracker, user_id: int):
+        super().__init__(label="🔁 Reset Stats", style=discord.ButtonStyle.danger)
+        self.cog = cog
+        self.user_id = user_id
+
+    async def callback(self, interaction: discord.Interaction):
+        if interaction.user.id != self.user_id:
+            return await interaction.response.send_message("You can only reset **your own** VC stats.", ephemeral=True)
+
+        user_id_str = str(self.user_id)
+        self.cog.buffer.discard(user_id_str)
+        async with self.cog.db.transaction() as conn:
+            for table in ("sessions", "response_times", "wait_logs", "switch_logs", "vc_channels", "vc_totals", "vc_users",
+                          *BUCKETS):
+                await conn.execute(f"DELETE FROM {table} WHERE user_id = ?", (user_id_str,))
+        self.cog.invalidate(user_id_str)
+
+        await interaction.response.send_message("✅ Your VC stats have been reset.", ephemeral=True)
+        await interaction.message.delete()
+
+
+class VCLeaderboardButton(Button):
+    def __init__(self, cog: VCTracker, period: str = "all"):
+        super().__init__(label="📊 Leaderboard", style=discord.ButtonStyle.primary)
+        self.cog = cog
+        self.period = period
+
+    async def callback(self, interaction: discord.Interaction):
+        # The flush can take a while under load; answer within Discord's 3s first.
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        # If the flush fails, show what's already committed rather than nothing.
+        await self.cog.write_out()
+        guild_id = interaction.guild.id
+        user_id = str(interaction.user.id)
+        own = None
+        if self.period == "all":
+            # Both queries walk the vc_totals_rank index; nothing is summed here.
+            rows = await self.cog.db.fetchall("""
+                SELECT user_id, total_seconds FROM vc_totals
+                WHERE guild_id = ? ORDER BY total_seconds DESC LIMIT 10
+            """, (guild_id,))
+            if rows and not any(r["user_id"] == user_id for r in rows):
+                own_total = await self.cog.db.fetchval(
+                    "SELECT total_seconds FROM vc_totals WHERE guild_id = ? AND user_id = ?", (guild_id, user_id)
+                )
+                if own_total is not None:
+                    ahead = await self.cog.db.fetchval(
+                        "SELECT COUNT(*) FROM vc_totals WHERE guild_id = ? AND total_seconds > ?", (guild_id, own_total)
+                    )
+                    own = (ahead + 1, own_total)
+            title = "VC Time Leaderboard"
+        else:
+            # At most a row per member, channel and day of the period, plus
+            # the hours before its first midnight.
+            start, midnight = period_start(PERIODS[self.period])
+            ranked = await self.cog.db.fetchall(f"""
+                SELECT user_id, SUM(seconds) AS total_seconds
+                FROM ({PERIOD_ROWS.format(key="guild_id")})
+                GROUP BY user_id ORDER BY total_seconds DESC
+            """, (guild_id, start, midnight, guild_id, midnight))
+            rows = ranked[:10]
+            own = next(((idx, r["total_seconds"]) for idx, r in enumerate(ranked, 1) if r["user_id"] == user_id), None)
+            if own is not None and own[0] <= 10:
+                own = None
+            title = f"VC Time Leaderboard (last {PERIODS[self.period]} days)"
+
+        leaderboard = []
+        for idx, r in enumerate(rows, 1):
+            user = interaction.guild.get_member(int(r["user_id"]))
+            name = user.display_name if user else f"<@{r['user_id']}>"
+            total = str(timedelta(seconds=int(r["total_seconds"])))
+            leaderboard.append(f"#{idx}: **{name}** — {total}")
+
+        embed = discord.Embed(title=title, color=discord.Color.gold())
+        embed.description = "\n".join(leaderboard) if leaderboard else "No data yet."
+        if own is not None:
+            embed.set_footer(text=f"Your rank: #{own[0]} — {timedelta(seconds=int(own[1]))}")
+        await interaction.followup.send(embed=embed, ephemeral=True)
+
+
+async def setup(bot):
+    await bot.add_cog(VCTracker(bot))
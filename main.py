@@ -1,40 +1,142 @@
 import discord
 from discord.ext import commands
 import os
+import time
 from dotenv import load_dotenv
 from cogs.general.suggestion import PersistentApproveRejectView
+from utils.cache import cache_policy
+from utils.db import close_all
+from utils.extensions import MANIFEST, ExtensionLoader, enabled_manifest, required_intents
+from utils.http import create_session
+from utils.metrics import Metrics
+from utils.modlog import ModLog
+from utils.outbound import NyastraContext, OutboundScheduler
+from utils.settings import GuildSettings
 load_dotenv()
 
 
-intents = discord.Intents.default()
-intents.message_content = True
+# One "Nya!" reply per channel every 10 seconds, however often the bot is pinged.
+mention_cooldown = commands.CooldownMapping.from_cooldown(1, 10, commands.BucketType.channel)
 
-bot = commands.Bot(command_prefix='.', intents=intents, help_command=None)
 
-@bot.event
-async def on_ready():
-    print(f'Logged in as {bot.user.name} - {bot.user.id}')
-    print('------')
-    await bot.change_presence(activity=discord.Activity(type=discord.ActivityType.watching, name="you"))
+class Nyastra(commands.AutoShardedBot):
+    def __init__(self, cluster_id=0, manifest=MANIFEST, lazy_chunk=False, **kwargs):
+        super().__init__(**kwargs)
+        # With several clusters, cluster 0 is the leader and is the only one
+        # that runs bot-wide background jobs.
+        self.cluster_id = cluster_id
+        self.is_leader = cluster_id == 0
+        self.http_session = None
+        self.mention_tokens = ()
+        self.started_at = time.perf_counter()
+        self.extension_loader = ExtensionLoader(self, manifest)
+        self.metrics = Metrics()
+        self.outbound = OutboundScheduler(self.metrics)
+        self.modlog = ModLog(self.outbound)
+        self.settings = GuildSettings(self)
+        self.lazy_chunk = lazy_chunk
+        self._chunk_requested = set()
+        self.before_invoke(self.prepare_invoke)
+        self.after_invoke(self.metrics.after_invoke)
 
-@bot.event
-async def setup_hook():
-    await bot.load_extension('cogs.general')
-    await bot.load_extension('cogs.fun')
-    await bot.load_extension('cogs.moderation')
-    await bot.load_extension('cogs.AI')
-    bot.add_view(PersistentApproveRejectView())
+    async def prepare_invoke(self, ctx):
+        await self.metrics.before_invoke(ctx)
+        # Without chunk-on-startup, a guild's member list is fetched in the
+        # background the first time someone uses a command there.
+        guild = ctx.guild
+        if self.lazy_chunk and guild is not None and not guild.chunked and guild.id not in self._chunk_requested:
+            self._chunk_requested.add(guild.id)
+            self.loop.create_task(guild.chunk())
 
-@bot.event
-async def on_message(message):
-    if message.author == bot.user:
-        return
+    async def setup_hook(self):
+        self.mention_tokens = (f'<@{self.user.id}>', f'<@!{self.user.id}>')
+        self.http_session = create_session()
+        self.outbound.start()
+        metrics_port = int(os.getenv('METRICS_PORT', '9108'))
+        await self.metrics.start(port=metrics_port + self.cluster_id if metrics_port else 0)
 
-    if bot.user in message.mentions:
-        await message.channel.send(f'Nya! What can I do for you, {message.author.mention}?\nRun `.help` to see my commands!')
+        await self.settings.load()
+        await self.extension_loader.load_eager()
+        self.add_view(PersistentApproveRejectView())
+        # Heavy extensions (OpenAI client, VC tracker DB) wait until after READY.
+        self.loop.create_task(self.extension_loader.load_deferred())
 
-    await bot.process_commands(message)
+    async def on_ready(self):
+        print(f'Logged in as {self.user.name} - {self.user.id} (cluster {self.cluster_id}, shards {sorted(self.shards)})')
+        print(f'Ready in {time.perf_counter() - self.started_at:.2f}s')
+        print('------')
+        await self.change_presence(activity=discord.Activity(type=discord.ActivityType.watching, name="you"))
 
+    async def on_message(self, message):
+        # Runs for every message the bot can see, so everything before
+        # process_commands sticks to cheap string checks.
+        if message.author.id == self.user.id:
+            return
 
-bot.run(os.getenv('DISCORD_BOT_TOKEN'))
-#bot.run(os.getenv('TEST_TOKEN'))
\ No newline at end of file
+        content = message.content
+        if '<@' in content and any(token in content for token in self.mention_tokens):
+            if not mention_cooldown.update_rate_limit(message):
+                await message.channel.send(f'Nya! What can I do for you, {message.author.mention}?\nRun `.help` to see my commands!')
+
+        if message.author.bot or not content.startswith(self.command_prefix):
+            return
+        invoked = content[len(self.command_prefix):].split(None, 1)
+        if not invoked or invoked[0] not in self.all_commands:
+            return
+
+        await self.process_commands(message)
+
+    async def get_context(self, origin, *, cls=NyastraContext):
+        # Replies go through the outbound scheduler, prioritised by cog.
+        return await super().get_context(origin, cls=cls)
+
+    async def _run_event(self, coro, event_name, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            await super()._run_event(coro, event_name, *args, **kwargs)
+        finally:
+            self.metrics.observe_listener(coro.__qualname__, time.perf_counter() - started)
+
+    async def on_error(self, event_method, *args, **kwargs):
+        self.metrics.record_event_error(event_method)
+        await super().on_error(event_method, *args, **kwargs)
+
+    async def close(self):
+        # Post any queued mod-log entries while the connection is still up.
+        await self.modlog.flush()
+        await super().close()
+        self.outbound.stop()
+        await self.metrics.stop()
+        if self.http_session is not None:
+            await self.http_session.close()
+        await close_all()
+
+
+def create_bot(cluster_id=0, shard_ids=None, shard_count=None):
+    # Only subscribe to the gateway events the enabled extensions handle.
+    manifest = enabled_manifest()
+    intents = required_intents(manifest)
+    cache_options, lazy_chunk = cache_policy(manifest, intents)
+    return Nyastra(
+        cluster_id=cluster_id,
+        manifest=manifest,
+        lazy_chunk=lazy_chunk,
+        shard_ids=shard_ids,
+        shard_count=shard_count,
+        command_prefix='.',
+        intents=intents,
+        help_command=None,
+        **cache_options,
+    )
+
+
+def run(cluster_id=0, shard_ids=None, shard_count=None):
+    if shard_count is None and os.getenv('SHARD_COUNT'):
+        shard_count = int(os.getenv('SHARD_COUNT'))
+    bot = create_bot(cluster_id, shard_ids, shard_count)
+    bot.run(os.getenv('DISCORD_BOT_TOKEN'))
+    #bot.run(os.getenv('TEST_TOKEN'))
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,125 @@
+import os
+import sys
+
+import discord
+
+# Attributes that point back into shared state rather than owning data.
+_SHARED = {"_state", "guild", "_guild", "_user", "_client", "_view_store", "_cache"}
+
+
+def _flags(names, intents):
+    if names == "all":
+        return discord.MemberCacheFlags.from_intents(intents)
+    flags = discord.MemberCacheFlags.none()
+    for name in names:
+        setattr(flags, name, True)
+    return flags
+
+
+def cache_policy(manifest, intents):
+    """Bot kwargs for member/message caching.
+
+    By default only what the manifest's extensions declare is cached. Override with
+    MEMBER_CACHE (all, none or a comma list of MemberCacheFlags), MESSAGE_CACHE_SIZE
+    and CHUNK_GUILDS (startup, lazy or off).
+    """
+    member_cache = os.getenv("MEMBER_CACHE", "").strip().lower()
+    if member_cache == "all":
+        names = "all"
+    elif member_cache == "none":
+        names = ()
+    elif member_cache:
+        names = tuple(name.strip() for name in member_cache.split(",") if name.strip())
+    else:
+        names = tuple({name for spec in manifest for name in spec.member_cache})
+
+    message_cache = int(os.getenv("MESSAGE_CACHE_SIZE", max((spec.messages for spec in manifest), default=0)))
+    chunking = os.getenv("CHUNK_GUILDS", "lazy").strip().lower()
+
+    return {
+        "member_cache_flags": _flags(names, intents),
+        # discord.py treats 0 as "use the default of 1000"; None turns it off.
+        "max_messages": message_cache or None,
+        "chunk_guilds_at_startup": chunking == "startup" and intents.members,
+    }, chunking == "lazy" and intents.members
+
+
+def approx_size(obj, seen=None, depth=3):
+    """Rough deep size of obj, without following references into shared state."""
+    if seen is None:
+        seen = set()
+    if id(obj) in seen or depth < 0:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj, 0)
+    if isinstance(obj, (str, bytes, int, float, bool)) or obj is None:
+        return size
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += approx_size(key, seen, depth - 1) + approx_size(value, seen, depth - 1)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for value in obj:
+            size += approx_size(value, seen, depth - 1)
+    else:
+        for cls in type(obj).__mro__:
+            for name in getattr(cls, "__slots__", ()):
+                if name not in _SHARED and hasattr(obj, name):
+                    size += approx_size(getattr(obj, name), seen, depth - 1)
+        for name, value in getattr(obj, "__dict__", {}).items():
+            if name not in _SHARED:
+                size += approx_size(value, seen, depth - 1)
+    return size
+
+
+def _sampled(items, count, sample=500):
+    """Estimate the total size of count objects from the first `sample` of them."""
+    sizes = []
+    for item in items:
+        sizes.append(approx_size(item))
+        if len(sizes) >= sample:
+            break
+    return int(sum(sizes) / len(sizes) * count) if sizes else 0
+
+
+def memory_report(bot):
+    """(cache, entries, approx bytes) for each of the bot's caches."""
+    guilds = bot.guilds
+    member_count = sum(len(guild._members) for guild in guilds)
+    members = (member for guild in guilds for member in guild._members.values())
+    messages = bot.cached_messages
+    view_store = bot._connection._view_store
+    views = set(bot.persistent_views) | set(view_store._synced_message_views.values())
+
+    guild_seen = set()
+    # Members are reported on their own line, so don't count them under guilds.
+    for guild in guilds:
+        guild_seen.add(id(guild._members))
+    return [
+        ("guilds", len(guilds), sum(approx_size(guild, guild_seen) for guild in guilds)),
+        ("members", member_count, _sampled(members, member_count)),
+        ("users", len(bot.users), _sampled(bot.users, len(bot.users))),
+        ("messages", len(messages), _sampled(messages, len(messages))),
+        ("views", len(views), sum(approx_size(view) for view in views)),
+    ]
+
+
+def process_rss():
+    """Resident set size in bytes (peak RSS where /proc isn't available)."""
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def format_bytes(size):
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}GiB"
@@ -0,0 +1,118 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
+import aiosqlite
+
+PRAGMAS = (
+    # WAL lets readers carry on while another cluster process writes, and the
+    # busy timeout makes concurrent writers queue up instead of failing.
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA busy_timeout=30000",
+    # In WAL mode NORMAL only skips the fsync on each commit; the database
+    # can lose the last commits on power loss but can't be corrupted.
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8000",
+)
+
+_databases = {}
+
+
+class Database:
+    """One shared aiosqlite connection to a database file.
+
+    aiosqlite runs every call on the connection's own thread, so the event
+    loop never waits on disk, and all writes to a file go through one writer.
+    Statements are kept in sqlite's prepared statement cache, so repeated
+    queries aren't re-parsed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = None
+        self.ready = None
+        self._lock = asyncio.Lock()
+
+    async def connect(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.conn = await aiosqlite.connect(self.path, timeout=30, cached_statements=256)
+        self.conn.row_factory = aiosqlite.Row
+        for pragma in PRAGMAS:
+            await self.conn.execute(pragma)
+        return self
+
+    async def execute(self, sql, params=()):
+        """Run one write statement and commit. Returns the cursor's rowcount."""
+        async with self._lock:
+            cursor = await self.conn.execute(sql, params)
+            await self.conn.commit()
+            return cursor.rowcount
+
+    async def executemany(self, sql, rows):
+        async with self._lock:
+            await self.conn.executemany(sql, rows)
+            await self.conn.commit()
+
+    async def executescript(self, script):
+        async with self._lock:
+            await self.conn.executescript(script)
+            await self.conn.commit()
+
+    async def fetchone(self, sql, params=()):
+        async with self.conn.execute(sql, params) as cursor:
+            return await cursor.fetchone()
+
+    async def fetchall(self, sql, params=()):
+        async with self.conn.execute(sql, params) as cursor:
+            return await cursor.fetchall()
+
+    async def fetchval(self, sql, params=(), default=None):
+        row = await self.fetchone(sql, params)
+        return row[0] if row is not None and row[0] is not None else default
+
+    @asynccontextmanager
+    async def transaction(self, immediate=False):
+        """Several statements committed together, or not at all.
+
+        immediate takes the write lock up front, so other processes sharing
+        the file wait instead of racing on what is read inside.
+        """
+        async with self._lock:
+            # sqlite3 only opens transactions implicitly before DML, so begin
+            # explicitly to cover schema changes too.
+            await self.conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            try:
+                yield self.conn
+            except BaseException:
+                await self.conn.rollback()
+                raise
+            else:
+                await self.conn.commit()
+
+    async def close(self):
+        if self.conn is not None:
+            await self.conn.close()
+            self.conn = None
+
+
+async def open_db(path):
+    """The shared Database for path, connecting on first use."""
+    path = os.path.normpath(path)
+    db = _databases.get(path)
+    if db is None:
+        db = _databases[path] = Database(path)
+        db.ready = asyncio.ensure_future(db.connect())
+    try:
+        await db.ready
+    except Exception:
+        _databases.pop(path, None)
+        raise
+    return db
+
+
+async def close_all():
+    databases = list(_databases.values())
+    _databases.clear()
+    for db in databases:
+        await db.close()
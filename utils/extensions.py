@@ -0,0 +1,201 @@
+import asyncio
+import os
+import time
+import traceback
+from typing import NamedTuple
+
+import discord
+from discord.ext import commands
+
+# Every extension uses prefix commands, which need message events and content.
+BASE_INTENTS = ("guilds", "guild_messages", "dm_messages", "message_content")
+
+# The intents (any one of them) that Discord needs before it sends an event.
+EVENT_INTENTS = {
+    "on_message": ("guild_messages", "dm_messages"),
+    "on_message_edit": ("guild_messages", "dm_messages"),
+    "on_message_delete": ("guild_messages", "dm_messages"),
+    "on_reaction_add": ("guild_reactions", "dm_reactions"),
+    "on_reaction_remove": ("guild_reactions", "dm_reactions"),
+    "on_typing": ("guild_typing", "dm_typing"),
+    "on_voice_state_update": ("voice_states",),
+    "on_member_join": ("members",),
+    "on_member_remove": ("members",),
+    "on_member_update": ("members",),
+    "on_presence_update": ("presences",),
+    "on_member_ban": ("moderation",),
+    "on_member_unban": ("moderation",),
+    "on_invite_create": ("invites",),
+}
+
+
+class ExtensionSpec(NamedTuple):
+    name: str
+    # Lazy extensions are loaded once the bot is READY, or earlier if one of
+    # their commands is used. Until then `commands` are answered by stubs.
+    lazy: bool = False
+    commands: tuple = ()
+    # What the extension needs cached: MemberCacheFlags names, and how many
+    # messages (0 means it never reads the message cache).
+    member_cache: tuple = ()
+    messages: int = 0
+    # Gateway events its listeners handle, and any intents it needs beyond those.
+    events: tuple = ()
+    intents: tuple = ()
+
+
+MANIFEST = (
+    ExtensionSpec("cogs.general"),
+    ExtensionSpec("cogs.fun"),
+    ExtensionSpec("cogs.moderation"),
+    ExtensionSpec("cogs.voice", lazy=True, commands=("vcstats", "vct", "vcs", "vcactivity", "vca"), member_cache=("voice",),
+                  events=("on_voice_state_update",)),
+    ExtensionSpec("cogs.AI", lazy=True, commands=("recap", "recaptoggle", "rt", "recapview", "rv")),
+)
+
+
+def enabled_manifest(manifest=MANIFEST):
+    """The manifest minus anything listed in DISABLED_EXTENSIONS."""
+    disabled = {name.strip() for name in os.getenv("DISABLED_EXTENSIONS", "").split(",") if name.strip()}
+    return tuple(spec for spec in manifest if spec.name not in disabled)
+
+
+def required_intents(manifest):
+    """The smallest Intents that covers every extension in the manifest."""
+    intents = discord.Intents.none()
+    names = list(BASE_INTENTS)
+    for spec in manifest:
+        names += spec.intents
+        for event in spec.events:
+            names += EVENT_INTENTS.get(event, ())
+    names += [name.strip() for name in os.getenv("EXTRA_INTENTS", "").split(",") if name.strip()]
+    for name in names:
+        setattr(intents, name, True)
+    return intents
+
+
+class ExtensionLoader:
+    def __init__(self, bot, manifest=MANIFEST):
+        self.bot = bot
+        self.manifest = manifest
+        self.timings = {}
+        self._locks = {}
+
+    async def _load(self, spec):
+        started = time.perf_counter()
+        await self.bot.load_extension(spec.name)
+        self.timings[spec.name] = time.perf_counter() - started
+        print(f"Loaded {spec.name} in {self.timings[spec.name] * 1000:.1f}ms")
+        self._check_listeners(spec)
+
+    def _cogs(self, name):
+        return [
+            cog for cog in self.bot.cogs.values()
+            if cog.__module__ == name or cog.__module__.startswith(name + ".")
+        ]
+
+    def _check_listeners(self, spec):
+        # A listener for an event whose intent is off is silently never called.
+        intents = self.bot.intents
+        for cog in self._cogs(spec.name):
+            for event, _ in cog.get_listeners():
+                needed = EVENT_INTENTS.get(event, ())
+                if event not in spec.events:
+                    print(f"Warning: {cog.qualified_name} listens to {event} but {spec.name} doesn't declare it")
+                if needed and not any(getattr(intents, name) for name in needed):
+                    print(f"Warning: {cog.qualified_name}.{event} needs the {' or '.join(needed)} intent, which is disabled")
+
+    async def load_eager(self):
+        for spec in self.manifest:
+            if spec.lazy:
+                self._add_stubs(spec)
+            else:
+                await self._load(spec)
+
+    async def load_deferred(self):
+        await self.bot.wait_until_ready()
+        for spec in self.manifest:
+            if not spec.lazy:
+                continue
+            # One broken extension (e.g. AI without OPENAI_API_KEY) shouldn't
+            # keep the rest from loading. Its stubs stay and retry on use.
+            try:
+                await self.ensure_loaded(spec)
+            except Exception:
+                print(f"Failed to load {spec.name}:")
+                traceback.print_exc()
+        total = sum(self.timings.values())
+        print(f"All extensions loaded, {total * 1000:.1f}ms spent importing and setting up cogs")
+
+    async def ensure_loaded(self, spec):
+        lock = self._locks.setdefault(spec.name, asyncio.Lock())
+        async with lock:
+            if spec.name in self.bot.extensions:
+                return
+            self._remove_stubs(spec)
+            try:
+                await self._load(spec)
+            except Exception:
+                self._add_stubs(spec)
+                raise
+
+    def find(self, name):
+        for spec in self.manifest:
+            if name in (spec.name, spec.name.rpartition(".")[2]):
+                return spec
+        return None
+
+    async def reload(self, spec):
+        """Reload an extension in place, carrying cog state across.
+
+        Cogs can define export_state() and import_state(state) to keep
+        volatile state (open sessions, cooldowns, toggles) over the reload.
+        """
+        lock = self._locks.setdefault(spec.name, asyncio.Lock())
+        async with lock:
+            if spec.name not in self.bot.extensions:
+                # Not loaded yet (or its deferred load failed), so its stubs
+                # still hold the command names.
+                self._remove_stubs(spec)
+                try:
+                    return await self._load(spec)
+                except Exception:
+                    if spec.lazy:
+                        self._add_stubs(spec)
+                    raise
+
+            handoff = {
+                cog.qualified_name: cog.export_state()
+                for cog in self._cogs(spec.name) if hasattr(cog, "export_state")
+            }
+            started = time.perf_counter()
+            try:
+                await self.bot.reload_extension(spec.name)
+            finally:
+                # On failure discord.py restores the old module, whose cogs
+                # start empty too, so hand the state over either way.
+                for cog in self._cogs(spec.name):
+                    state = handoff.get(cog.qualified_name)
+                    if state is not None and hasattr(cog, "import_state"):
+                        cog.import_state(state)
+            self.timings[spec.name] = time.perf_counter() - started
+            print(f"Reloaded {spec.name} in {self.timings[spec.name] * 1000:.1f}ms")
+            self._check_listeners(spec)
+
+    def _add_stubs(self, spec):
+        for name in spec.commands:
+            self.bot.add_command(commands.Command(self._make_stub(spec), name=name, hidden=True))
+
+    def _remove_stubs(self, spec):
+        for name in spec.commands:
+            self.bot.remove_command(name)
+
+    def _make_stub(self, spec):
+        async def stub(ctx):
+            await self.ensure_loaded(spec)
+            # Re-dispatch the original message now that the real command exists.
+            ctx = await self.bot.get_context(ctx.message)
+            if ctx.command is not None and ctx.command.callback is not stub:
+                await self.bot.invoke(ctx)
+
+        return stub
@@ -0,0 +1,112 @@
+import random
+import time
+from collections import OrderedDict, deque
+
+from utils.migrations import open_migrated
+
+DB_FILE = "./Databases/GifCatalog.db"
+
+MIGRATIONS = [
+    ("""CREATE TABLE IF NOT EXISTS gifs (
+            reaction TEXT NOT NULL,
+            url TEXT NOT NULL,
+            last_seen REAL NOT NULL,
+            PRIMARY KEY (reaction, url)
+        )""",),
+    # Loading a reaction reads its URLs oldest first.
+    ("CREATE INDEX gifs_reaction_seen ON gifs (reaction, last_seen)",),
+]
+
+
+class GifCatalog:
+    """On-disk catalog of every GIF URL seen per reaction, used as a fallback
+    when the API is slow or down. Nothing is opened or read until first use."""
+
+    def __init__(self, path=DB_FILE, max_per_reaction=500):
+        self.path = path
+        self.max_per_reaction = max_per_reaction
+        self._db = None
+        self._urls = {}
+        self._pending = {}
+
+    async def _connect(self):
+        if self._db is None:
+            self._db = await open_migrated(self.path, MIGRATIONS)
+        return self._db
+
+    async def _load(self, reaction):
+        urls = self._urls.get(reaction)
+        if urls is None:
+            db = await self._connect()
+            rows = await db.fetchall("SELECT url FROM gifs WHERE reaction = ? ORDER BY last_seen", (reaction,))
+            urls = OrderedDict((row[0], None) for row in rows)
+            for url in self._pending.get(reaction, ()):
+                urls[url] = None
+                urls.move_to_end(url)
+            self._urls[reaction] = urls
+        return urls
+
+    def add(self, reaction, url):
+        self._pending.setdefault(reaction, {})[url] = time.time()
+        urls = self._urls.get(reaction)
+        if urls is not None:
+            urls[url] = None
+            urls.move_to_end(url)
+            while len(urls) > self.max_per_reaction:
+                urls.popitem(last=False)
+
+    async def pick(self, reaction, exclude=()):
+        urls = await self._load(reaction)
+        if not urls:
+            return None
+        candidates = [url for url in urls if url not in exclude]
+        # A repeat beats no GIF at all.
+        return random.choice(candidates or list(urls))
+
+    async def flush(self):
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        db = await self._connect()
+        async with db.transaction() as conn:
+            for reaction, urls in pending.items():
+                await conn.executemany("""
+                    INSERT INTO gifs (reaction, url, last_seen) VALUES (?, ?, ?)
+                    ON CONFLICT(reaction, url) DO UPDATE SET last_seen = excluded.last_seen
+                """, [(reaction, url, seen) for url, seen in urls.items()])
+                await conn.execute("""
+                    DELETE FROM gifs WHERE reaction = ? AND url NOT IN (
+                        SELECT url FROM gifs WHERE reaction = ? ORDER BY last_seen DESC LIMIT ?
+                    )
+                """, (reaction, reaction, self.max_per_reaction))
+
+    async def close(self):
+        # The connection is shared and closed with the others on shutdown.
+        await self.flush()
+        self._db = None
+
+
+class RecentlyShown:
+    """Small LRU of the last few GIFs shown in each channel."""
+
+    def __init__(self, per_channel=8, max_channels=2000):
+        self.per_channel = per_channel
+        self.max_channels = max_channels
+        self._channels = OrderedDict()
+
+    def get(self, channel_id):
+        recent = self._channels.get(channel_id)
+        if recent is None:
+            return ()
+        self._channels.move_to_end(channel_id)
+        return recent
+
+    def add(self, channel_id, url):
+        recent = self._channels.get(channel_id)
+        if recent is None:
+            recent = self._channels[channel_id] = deque(maxlen=self.per_channel)
+            if len(self._channels) > self.max_channels:
+                self._channels.popitem(last=False)
+        else:
+            self._channels.move_to_end(channel_id)
+        recent.append(url)
@@ -0,0 +1,132 @@
+import asyncio
+import traceback
+from collections import deque
+
+import aiohttp
+from discord.ext import tasks
+
+from utils.gif_catalog import RecentlyShown
+from utils.gif_providers import GifProviderError
+
+FETCH_ERRORS = (GifProviderError, aiohttp.ClientError, asyncio.TimeoutError, KeyError, ValueError)
+
+
+class GifPool:
+    """Per-reaction reservoir of prefetched GIF URLs.
+
+    Commands pop a URL instantly and only fall back to a live fetch when the
+    reservoir is empty. A background loop tops every reservoir back up once it
+    drops below its low-water mark, and busier reactions get bigger reservoirs.
+    """
+
+    def __init__(self, router, catalog=None, min_size=2, max_size=15, low_water=0.5, concurrency=4,
+                 decay=0.99, latency_budget=1.5):
+        self.router = router
+        self.catalog = catalog
+        self.recent = RecentlyShown()
+        self.min_size = min_size
+        self.max_size = max_size
+        self.low_water = low_water
+        self.decay = decay
+        self.latency_budget = latency_budget
+        self._pools = {}
+        self._usage = {}
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    def start(self):
+        self.refill.start()
+
+    async def stop(self):
+        self.refill.cancel()
+        if self.catalog is not None:
+            await self.catalog.close()
+
+    def track(self, reaction):
+        self._pools.setdefault(reaction, deque())
+        self._usage.setdefault(reaction, 0.0)
+
+    def target_size(self, reaction):
+        peak = max(self._usage.values(), default=0.0)
+        if peak <= 0:
+            return self.min_size
+        share = self._usage.get(reaction, 0.0) / peak
+        return self.min_size + round((self.max_size - self.min_size) * share)
+
+    async def _fetch(self, reaction, hedge=False):
+        url = await self.router.fetch(reaction, hedge=hedge)
+        if self.catalog is not None:
+            self.catalog.add(reaction, url)
+        return url
+
+    def _keep(self, reaction, url):
+        pool = self._pools[reaction]
+        if url not in pool and len(pool) < self.max_size:
+            pool.append(url)
+
+    def _pop(self, reaction, recent):
+        pool = self._pools[reaction]
+        for _ in range(len(pool)):
+            url = pool.popleft()
+            if url not in recent:
+                return url
+            # Shown here recently, but still fine for other channels.
+            pool.append(url)
+        return None
+
+    async def _fetch_within_budget(self, reaction):
+        task = asyncio.ensure_future(self._fetch(reaction, hedge=True))
+        done, _ = await asyncio.wait({task}, timeout=self.latency_budget)
+        if done:
+            return task.result()
+
+        # Let the slow request finish in the background so its URL still
+        # lands in the pool and catalog.
+        def keep_late_result(task):
+            if not task.cancelled() and task.exception() is None:
+                self._keep(reaction, task.result())
+
+        task.add_done_callback(keep_late_result)
+        raise asyncio.TimeoutError
+
+    async def get(self, reaction, channel_id=None):
+        self.track(reaction)
+        self._usage[reaction] += 1
+        recent = self.recent.get(channel_id)
+
+        url = self._pop(reaction, recent)
+        if url is None:
+            try:
+                url = await self._fetch_within_budget(reaction)
+            except FETCH_ERRORS:
+                url = await self.catalog.pick(reaction, exclude=recent) if self.catalog is not None else None
+                if url is None:
+                    raise
+
+        if channel_id is not None:
+            self.recent.add(channel_id, url)
+        return url
+
+    async def _fetch_into(self, reaction):
+        async with self._semaphore:
+            try:
+                url = await self._fetch(reaction)
+            except FETCH_ERRORS:
+                return
+        self._keep(reaction, url)
+
+    @tasks.loop(seconds=2)
+    async def refill(self):
+        jobs = []
+        for reaction, pool in self._pools.items():
+            self._usage[reaction] *= self.decay
+            target = self.target_size(reaction)
+            if len(pool) <= target * self.low_water:
+                jobs.extend(self._fetch_into(reaction) for _ in range(target - len(pool)))
+        # An unhandled error would stop the loop for good, and prefetching with it.
+        try:
+            if jobs:
+                await asyncio.gather(*jobs)
+            if self.catalog is not None:
+                await self.catalog.flush()
+        except Exception:
+            traceback.print_exc()
@@ -0,0 +1,215 @@
+import asyncio
+import os
+import time
+from collections import deque
+
+import aiohttp
+
+from utils.http import fetch_json
+
+
+class GifProviderError(Exception):
+    pass
+
+
+class GifProvider:
+    def __init__(self, name, url, extract, tags=None):
+        self.name = name
+        self.url = url
+        self.extract = extract
+        # Maps our reaction tag to the provider's own name; None means the
+        # provider understands every tag as-is.
+        self.tags = tags
+
+    def supports(self, tag):
+        return self.tags is None or tag in self.tags
+
+    def url_for(self, tag):
+        return self.url.format(tag=tag if self.tags is None else self.tags[tag])
+
+
+_COMMON_TAGS = ("hug", "kiss", "pat", "slap", "poke", "bite", "smug", "dance", "cry", "blush", "wink", "wave", "smile", "happy")
+
+PROVIDERS = {
+    "otakugifs": GifProvider(
+        "otakugifs", "https://api.otakugifs.xyz/gif?reaction={tag}", lambda data: data["url"]
+    ),
+    "nekosbest": GifProvider(
+        "nekosbest", "https://nekos.best/api/v2/{tag}", lambda data: data["results"][0]["url"],
+        tags={tag: tag for tag in _COMMON_TAGS + ("pout", "facepalm", "shrug", "yawn", "sleep", "laugh")},
+    ),
+    "waifupics": GifProvider(
+        "waifupics", "https://api.waifu.pics/sfw/{tag}", lambda data: data["url"],
+        tags={tag: tag for tag in _COMMON_TAGS},
+    ),
+}
+
+
+def providers_from_env():
+    names = os.getenv("GIF_PROVIDERS", "otakugifs,nekosbest,waifupics")
+    return [PROVIDERS[name.strip()] for name in names.split(",") if name.strip() in PROVIDERS]
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allows(self):
+        state = self.state
+        return state == self.CLOSED or (state == self.HALF_OPEN and not self.probing)
+
+    def acquire(self):
+        """Claim a call. While half-open only one probe goes through at a time.
+
+        Returns whether this call is the probe, or None if it isn't allowed.
+        """
+        if not self.allows():
+            return None
+        self.probing = self.state == self.HALF_OPEN
+        return self.probing
+
+    def end_probe(self):
+        self.probing = False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        # A failed probe while half-open re-opens the breaker straight away.
+        if self.failures >= self.failure_threshold or self.opened_at is not None:
+            self.opened_at = time.monotonic()
+
+
+class ProviderStats:
+    def __init__(self, window=100):
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)
+
+    def record(self, latency, ok):
+        self.latencies.append(latency)
+        self.outcomes.append(ok)
+
+    @property
+    def p95(self):
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    @property
+    def error_rate(self):
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+
+class GifRouter:
+    """Routes GIF lookups to the healthiest provider.
+
+    Providers are ranked by rolling p95 latency plus an error-rate penalty, each
+    one sits behind its own circuit breaker, and a slow request can be hedged
+    with a second one to the next provider after `hedge_after` seconds.
+    """
+
+    def __init__(self, bot, providers, timeout=4.0, hedge_after=0.8, min_samples=5):
+        self.bot = bot
+        self.providers = providers
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.hedge_after = hedge_after
+        self.min_samples = min_samples
+        self.breakers = {provider.name: CircuitBreaker() for provider in providers}
+        self.stats = {provider.name: ProviderStats() for provider in providers}
+
+    def score(self, provider):
+        stats = self.stats[provider.name]
+        # Barely sampled providers rank first so every provider gets measured.
+        if len(stats.latencies) < self.min_samples:
+            return 0.0
+        # A failed request costs roughly a full timeout, so charge for it.
+        return stats.p95 + stats.error_rate * self.timeout.total
+
+    def candidates(self, tag):
+        usable = [p for p in self.providers if p.supports(tag) and self.breakers[p.name].allows()]
+        return sorted(usable, key=self.score)
+
+    async def _request(self, provider, tag):
+        breaker = self.breakers[provider.name]
+        probe = breaker.acquire()
+        if probe is None:
+            raise GifProviderError(f"{provider.name} is unavailable")
+        start = time.perf_counter()
+        try:
+            data = await fetch_json(self.bot.http_session, provider.url_for(tag), timeout=self.timeout)
+            url = provider.extract(data)
+        except (aiohttp.ClientError, asyncio.TimeoutError, KeyError, IndexError, TypeError, ValueError):
+            self.stats[provider.name].record(time.perf_counter() - start, False)
+            breaker.record_failure()
+            raise
+        finally:
+            # Also when a hedged probe is cancelled, so the next caller can probe.
+            if probe:
+                breaker.end_probe()
+        self.stats[provider.name].record(time.perf_counter() - start, True)
+        breaker.record_success()
+        return url
+
+    async def fetch(self, tag, hedge=True):
+        remaining = iter(self.candidates(tag))
+        provider = next(remaining, None)
+        if provider is None:
+            raise GifProviderError(f"No GIF provider available for {tag!r}")
+
+        pending = {asyncio.ensure_future(self._request(provider, tag))}
+        hedged = not hedge
+        last_error = None
+        try:
+            while pending:
+                timeout = None if hedged else self.hedge_after
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    hedged = True
+                    provider = next(remaining, None)
+                    if provider is not None:
+                        pending.add(asyncio.ensure_future(self._request(provider, tag)))
+                    continue
+
+                # Read every exception before returning, or asyncio logs the
+                # ones left behind as never retrieved.
+                succeeded = None
+                for task in done:
+                    if task.exception() is None:
+                        succeeded = succeeded or task
+                    else:
+                        last_error = task.exception()
+                if succeeded is not None:
+                    return succeeded.result()
+
+                # Everything in flight failed, fail over to the next provider.
+                if not pending:
+                    provider = next(remaining, None)
+                    if provider is not None:
+                        pending.add(asyncio.ensure_future(self._request(provider, tag)))
+        finally:
+            for task in pending:
+                task.cancel()
+
+        raise GifProviderError(f"Every GIF provider failed for {tag!r}") from last_error
@@ -0,0 +1,22 @@
+import aiohttp
+
+DEFAULT_TIMEOUT = aiohttp.ClientTimeout(total=8, connect=3, sock_read=5)
+
+
+def create_session():
+    # One session for the whole bot: pooled keep-alive connections and cached DNS,
+    # so a reaction command never pays for a fresh TCP/TLS handshake.
+    connector = aiohttp.TCPConnector(
+        limit=100,
+        limit_per_host=20,
+        ttl_dns_cache=300,
+        keepalive_timeout=30,
+    )
+    return aiohttp.ClientSession(connector=connector, timeout=DEFAULT_TIMEOUT)
+
+
+async def fetch_json(session, url, *, params=None, timeout=None):
+    async with session.get(url, params=params, timeout=timeout or DEFAULT_TIMEOUT) as response:
+        response.raise_for_status()
+        return await response.json(content_type=None)
+
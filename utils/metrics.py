@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import re
+import time
+from collections import Counter
+
+from aiohttp import web
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+_SNOWFLAKE = re.compile(r"\d{15,}")
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th quantile."""
+        if not self.count:
+            return 0.0
+        running = 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            if running >= q * self.count:
+                return bound
+        return self.max
+
+    def render(self, name, labels=""):
+        lines = []
+        running = 0
+        sep = "," if labels else ""
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            lines.append(f'{name}_bucket{{{labels}{sep}le="{bound}"}} {running}')
+        lines.append(f'{name}_bucket{{{labels}{sep}le="+Inf"}} {self.count}')
+        plain = f"{{{labels}}}" if labels else ""
+        lines.append(f"{name}_sum{plain} {self.sum}")
+        lines.append(f"{name}_count{plain} {self.count}")
+        return lines
+
+
+class RateLimitHandler(logging.Handler):
+    # discord.py reports every 429 it receives as a warning on discord.http.
+    def __init__(self, metrics):
+        super().__init__(level=logging.WARNING)
+        self.metrics = metrics
+
+    def emit(self, record):
+        if not str(record.msg).startswith("We are being rate limited.") or len(record.args) < 2:
+            return
+        method, url = record.args[0], str(record.args[1])
+        path = url.split("/api/v", 1)[-1].partition("/")[2]
+        self.metrics.record_rate_limit(f"{method} /{_SNOWFLAKE.sub(':id', path)}", f"{method} /{path}")
+
+
+class Metrics:
+    def __init__(self, lag_interval=0.5):
+        self.started = time.time()
+        self.commands = {}
+        self.listeners = {}
+        self.command_errors = Counter()
+        self.event_errors = Counter()
+        self.rate_limits = Counter()
+        # Keyed by the concrete route too, so a 429 in one channel can be told
+        # apart from the rest.
+        self.last_rate_limit = {}
+        self.outbound_wait = {}
+        self.shed = Counter()
+        self.loop_lag = Histogram(LAG_BUCKETS)
+        self.lag_interval = lag_interval
+        self._handler = RateLimitHandler(self)
+        self._watchdog = None
+        self._runner = None
+
+    def observe_command(self, name, elapsed, failed):
+        self.commands.setdefault(name, Histogram()).observe(elapsed)
+        if failed:
+            self.command_errors[name] += 1
+
+    def observe_listener(self, name, elapsed):
+        self.listeners.setdefault(name, Histogram()).observe(elapsed)
+
+    def record_event_error(self, event):
+        self.event_errors[event] += 1
+
+    def record_rate_limit(self, route, path=None):
+        self.rate_limits[route] += 1
+        now = time.monotonic()
+        self.last_rate_limit[route] = now
+        if path is not None:
+            self.last_rate_limit[path] = now
+
+    def observe_outbound(self, priority, waited):
+        self.outbound_wait.setdefault(priority, Histogram()).observe(waited)
+
+    def record_shed(self, priority):
+        self.shed[priority] += 1
+
+    async def before_invoke(self, ctx):
+        ctx.metrics_started = time.perf_counter()
+
+    async def after_invoke(self, ctx):
+        started = getattr(ctx, "metrics_started", None)
+        if started is not None and ctx.command is not None:
+            self.observe_command(ctx.command.qualified_name, time.perf_counter() - started, ctx.command_failed)
+
+    async def _watch_loop_lag(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            before = loop.time()
+            await asyncio.sleep(self.lag_interval)
+            self.loop_lag.observe(max(0.0, loop.time() - before - self.lag_interval))
+
+    async def start(self, host="127.0.0.1", port=0):
+        logging.getLogger("discord.http").addHandler(self._handler)
+        self._watchdog = asyncio.create_task(self._watch_loop_lag())
+        if port:
+            app = web.Application()
+            app.router.add_get("/metrics", self._serve)
+            self._runner = web.AppRunner(app, access_log=None)
+            await self._runner.setup()
+            await web.TCPSite(self._runner, host, port).start()
+            print(f"Serving metrics on http://{host}:{port}/metrics")
+
+    async def stop(self):
+        logging.getLogger("discord.http").removeHandler(self._handler)
+        if self._watchdog is not None:
+            self._watchdog.cancel()
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def _serve(self, request):
+        return web.Response(text=self.render(), content_type="text/plain", charset="utf-8")
+
+    def render(self):
+        lines = ["# TYPE nyastra_command_latency_seconds histogram"]
+        for name, histogram in sorted(self.commands.items()):
+            lines += histogram.render("nyastra_command_latency_seconds", f'command="{name}"')
+        lines.append("# TYPE nyastra_command_errors_total counter")
+        for name, count in sorted(self.command_errors.items()):
+            lines.append(f'nyastra_command_errors_total{{command="{name}"}} {count}')
+
+        lines.append("# TYPE nyastra_listener_latency_seconds histogram")
+        for name, histogram in sorted(self.listeners.items()):
+            lines += histogram.render("nyastra_listener_latency_seconds", f'listener="{name}"')
+        lines.append("# TYPE nyastra_event_errors_total counter")
+        for event, count in sorted(self.event_errors.items()):
+            lines.append(f'nyastra_event_errors_total{{event="{event}"}} {count}')
+
+        lines.append("# TYPE nyastra_rest_rate_limits_total counter")
+        for route, count in sorted(self.rate_limits.items()):
+            lines.append(f'nyastra_rest_rate_limits_total{{route="{route}"}} {count}')
+
+        lines.append("# TYPE nyastra_outbound_queue_seconds histogram")
+        for priority, histogram in sorted(self.outbound_wait.items()):
+            lines += histogram.render("nyastra_outbound_queue_seconds", f'priority="{priority}"')
+        lines.append("# TYPE nyastra_outbound_shed_total counter")
+        for priority, count in sorted(self.shed.items()):
+            lines.append(f'nyastra_outbound_shed_total{{priority="{priority}"}} {count}')
+
+        lines.append("# TYPE nyastra_event_loop_lag_seconds histogram")
+        lines += self.loop_lag.render("nyastra_event_loop_lag_seconds")
+        lines.append("# TYPE nyastra_uptime_seconds gauge")
+        lines.append(f"nyastra_uptime_seconds {time.time() - self.started:.0f}")
+        return "\n".join(lines) + "\n"
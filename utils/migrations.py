@@ -0,0 +1,46 @@
+from utils.db import open_db
+
+
+def epoch(column):
+    """SQL converting an ISO-8601 UTC text column to integer epoch seconds."""
+    return f"CAST(strftime('%s', {column}) AS INTEGER)"
+
+
+def rebuild(table, create, columns):
+    """Statements that rebuild a table with a new schema, for changes ALTER
+    TABLE can't make. `columns` is the SELECT list that fills the new table."""
+    return (
+        create.replace(f"CREATE TABLE {table} ", f"CREATE TABLE {table}_new ", 1),
+        f"INSERT INTO {table}_new SELECT {columns} FROM {table}",
+        f"DROP TABLE {table}",
+        f"ALTER TABLE {table}_new RENAME TO {table}",
+    )
+
+
+async def migrate(db, migrations):
+    """Bring a database up to date.
+
+    `migrations` is the database's full history, oldest first; each entry
+    is a tuple of SQL statements. The number applied so far is kept in
+    PRAGMA user_version, and each migration runs in its own transaction
+    together with the version bump, so a failed one leaves nothing behind.
+    """
+    version = await db.fetchval("PRAGMA user_version", default=0)
+    for number, statements in enumerate(migrations, 1):
+        if number <= version:
+            continue
+        async with db.transaction(immediate=True) as conn:
+            # Another cluster process may have got here first.
+            async with conn.execute("PRAGMA user_version") as cursor:
+                if (await cursor.fetchone())[0] >= number:
+                    continue
+            for statement in statements:
+                await conn.execute(statement)
+            await conn.execute(f"PRAGMA user_version = {number}")
+        print(f"Migrated {db.path} to version {number}")
+
+
+async def open_migrated(path, migrations):
+    db = await open_db(path)
+    await migrate(db, migrations)
+    return db
@@ -0,0 +1,81 @@
+import asyncio
+import random
+from collections import deque
+
+import discord
+
+from utils.outbound import MODERATION
+
+MAX_EMBEDS = 10
+# Discord's limit on the combined text of every embed in one message.
+MAX_EMBED_CHARS = 6000
+
+
+class ModLog:
+    """Per-guild mod-log queue.
+
+    post() returns straight away. Embeds posted to a guild within `window`
+    seconds are sent together, up to ten per message, so a raid produces a
+    handful of log messages instead of hundreds.
+    """
+
+    def __init__(self, outbound, window=1.5, retries=5):
+        self.outbound = outbound
+        self.window = window
+        self.retries = retries
+        self.pending = {}
+        self._tasks = {}
+        self._flush_now = asyncio.Event()
+
+    def post(self, channel, embed):
+        guild_id = channel.guild.id
+        # Keep the newest channel in case the log channel was changed meanwhile.
+        _, embeds = self.pending.get(guild_id, (None, deque()))
+        embeds.append(embed)
+        self.pending[guild_id] = (channel, embeds)
+        if guild_id not in self._tasks:
+            self._tasks[guild_id] = asyncio.create_task(self._drain(guild_id))
+
+    async def _drain(self, guild_id):
+        try:
+            try:
+                await asyncio.wait_for(self._flush_now.wait(), timeout=self.window)
+            except asyncio.TimeoutError:
+                pass
+            while self.pending.get(guild_id, (None, None))[1]:
+                channel, embeds = self.pending[guild_id]
+                await self._deliver(channel, self._take_batch(embeds))
+        finally:
+            self.pending.pop(guild_id, None)
+            self._tasks.pop(guild_id, None)
+
+    def _take_batch(self, embeds):
+        batch = [embeds.popleft()]
+        size = len(batch[0])
+        while embeds and len(batch) < MAX_EMBEDS and size + len(embeds[0]) <= MAX_EMBED_CHARS:
+            size += len(embeds[0])
+            batch.append(embeds.popleft())
+        return batch
+
+    async def _deliver(self, channel, embeds):
+        # discord.py already retries a few times on 429s and 5xx errors, so
+        # this only takes over once it has given up.
+        for attempt in range(self.retries):
+            try:
+                await self.outbound.send(channel, MODERATION, embeds=embeds)
+                return
+            except discord.HTTPException as e:
+                if e.status != 429 and e.status < 500:
+                    print(f"Dropping {len(embeds)} mod-log embeds for {channel.guild.id}: {e}")
+                    return
+                # Shutting down: retry quickly, flush() won't wait long.
+                delay = 0.5 if self._flush_now.is_set() else min(60, 2 ** attempt)
+                await asyncio.sleep(delay + random.random())
+        print(f"Gave up delivering {len(embeds)} mod-log embeds for {channel.guild.id}")
+
+    async def flush(self, timeout=10):
+        """Send everything that's queued; used on shutdown."""
+        self._flush_now.set()
+        tasks = list(self._tasks.values())
+        if tasks:
+            await asyncio.wait(tasks, timeout=timeout)
@@ -0,0 +1,146 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+
+from discord.ext import commands
+
+MODERATION, GENERAL, LOW = 0, 1, 2
+PRIORITY_NAMES = ("moderation", "general", "low")
+
+# Which priority class a cog's replies get, by the extension it lives in.
+EXTENSION_PRIORITIES = {
+    "cogs.moderation": MODERATION,
+    "cogs.general": GENERAL,
+    "cogs.voice": GENERAL,
+    "cogs.fun": LOW,
+    "cogs.AI": LOW,
+}
+
+
+def priority_for(cog):
+    if cog is None:
+        return GENERAL
+    module = type(cog).__module__
+    for extension, priority in EXTENSION_PRIORITIES.items():
+        if module == extension or module.startswith(extension + "."):
+            return priority
+    return GENERAL
+
+
+class OutboundScheduler:
+    """Runs outbound sends in priority order, round-robin across guilds.
+
+    Some workers only ever take moderation work, so a backlog of fun replies
+    stuck behind a rate limit can't hold up a ban or its log post. Low
+    priority sends are dropped (the send returns None) once the queue is
+    deep, a guild has too many waiting, or the channel was just rate limited.
+    """
+
+    def __init__(self, metrics, workers=6, reserved=2, shed_depth=100, per_guild=10, rate_limit_cooldown=5.0):
+        self.metrics = metrics
+        self.workers = workers
+        self.reserved = reserved
+        self.shed_depth = shed_depth
+        self.per_guild = per_guild
+        self.rate_limit_cooldown = rate_limit_cooldown
+        self.queues = [OrderedDict() for _ in PRIORITY_NAMES]
+        self.depth = 0
+        self._ready = None
+        self._tasks = []
+
+    def start(self):
+        self._ready = asyncio.Condition()
+        self._tasks = [
+            asyncio.create_task(self._worker(MODERATION if i < self.reserved else LOW))
+            for i in range(self.workers)
+        ]
+
+    def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        for queue in self.queues:
+            for jobs in queue.values():
+                for _, future, _ in jobs:
+                    if not future.done():
+                        future.cancel()
+            queue.clear()
+        self.depth = 0
+
+    def _should_shed(self, priority, guild_id, route):
+        if priority < LOW:
+            return False
+        if self.depth >= self.shed_depth:
+            return True
+        if len(self.queues[priority].get(guild_id, ())) >= self.per_guild:
+            return True
+        limited_at = self.metrics.last_rate_limit.get(route)
+        return limited_at is not None and time.monotonic() - limited_at < self.rate_limit_cooldown
+
+    async def submit(self, priority, guild_id, route, factory):
+        """Queue factory() to run on a worker and return its result."""
+        if not self._tasks:
+            return await factory()
+        if self._should_shed(priority, guild_id, route):
+            self.metrics.record_shed(PRIORITY_NAMES[priority])
+            return None
+
+        future = asyncio.get_running_loop().create_future()
+        self.queues[priority].setdefault(guild_id, deque()).append((factory, future, time.perf_counter()))
+        self.depth += 1
+        async with self._ready:
+            # Reserved workers ignore low priority jobs, so wake everyone.
+            self._ready.notify_all()
+        return await future
+
+    async def send(self, channel, priority, *args, **kwargs):
+        guild_id = getattr(getattr(channel, "guild", None), "id", None)
+        route = f"POST /channels/{channel.id}/messages"
+        return await self.submit(priority, guild_id, route, lambda: channel.send(*args, **kwargs))
+
+    def _next(self, max_priority):
+        for priority in range(max_priority + 1):
+            queue = self.queues[priority]
+            if not queue:
+                continue
+            # Take one job from the guild at the front, then send that guild
+            # to the back so a busy guild can't starve the others.
+            guild_id, jobs = next(iter(queue.items()))
+            job = jobs.popleft()
+            if jobs:
+                queue.move_to_end(guild_id)
+            else:
+                del queue[guild_id]
+            self.depth -= 1
+            return priority, job
+        return None
+
+    async def _worker(self, max_priority):
+        while True:
+            async with self._ready:
+                await self._ready.wait_for(lambda: self._next_ready(max_priority))
+                priority, (factory, future, queued) = self._next(max_priority)
+            self.metrics.observe_outbound(PRIORITY_NAMES[priority], time.perf_counter() - queued)
+            if future.cancelled():
+                continue
+            try:
+                result = await factory()
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+
+    def _next_ready(self, max_priority):
+        return any(self.queues[priority] for priority in range(max_priority + 1))
+
+
+class NyastraContext(commands.Context):
+    async def send(self, *args, **kwargs):
+        outbound = getattr(self.bot, "outbound", None)
+        if outbound is None:
+            return await super().send(*args, **kwargs)
+        send = super().send
+        route = f"POST /channels/{self.channel.id}/messages"
+        guild_id = self.guild.id if self.guild else None
+        return await outbound.submit(priority_for(self.cog), guild_id, route, lambda: send(*args, **kwargs))
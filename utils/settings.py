@@ -0,0 +1,92 @@
+import os
+
+from utils.db import open_db
+from utils.migrations import open_migrated
+
+DB_FILE = "./Databases/Settings.db"
+
+DEFAULTS = {
+    "log_channel_id": None,
+    "suggest_channel_id": None,
+    "recap_enabled": True,
+}
+
+MIGRATIONS = [
+    ("""CREATE TABLE IF NOT EXISTS guild_settings (
+            guild_id INTEGER PRIMARY KEY,
+            log_channel_id INTEGER,
+            suggest_channel_id INTEGER,
+            recap_enabled INTEGER NOT NULL DEFAULT 1
+        )""",),
+]
+
+
+class GuildSettings:
+    """Per-guild configuration, kept in memory and written through to Settings.db.
+
+    Every guild lives on one shard, and so in one process, so the cache here
+    is the only copy that changes. Lookups are plain dict reads. Changes
+    dispatch a ``guild_settings_update(guild_id, changes)`` event.
+    """
+
+    def __init__(self, bot, path=DB_FILE):
+        self.bot = bot
+        self.path = path
+        self.db = None
+        self._cache = {}
+
+    async def load(self):
+        self.db = await open_migrated(self.path, MIGRATIONS)
+        if await self.db.fetchval("SELECT COUNT(*) FROM guild_settings") == 0:
+            await self._import_legacy()
+
+        for row in await self.db.fetchall("SELECT * FROM guild_settings"):
+            self._cache[row["guild_id"]] = {
+                "log_channel_id": row["log_channel_id"],
+                "suggest_channel_id": row["suggest_channel_id"],
+                "recap_enabled": bool(row["recap_enabled"]),
+            }
+        print(f"Loaded settings for {len(self._cache)} guilds")
+
+    async def _import_legacy(self):
+        # Settings used to live in each feature's own database. Opening one
+        # that doesn't exist would create it, so fresh installs skip this.
+        rows = {}
+        for slot, (path, table) in enumerate((("./Databases/Ban.db", "log_channels"),
+                                              ("./Databases/Suggestion.db", "suggest_settings"))):
+            if not os.path.exists(path):
+                continue
+            legacy_db = await open_db(path)
+            if await legacy_db.fetchval("SELECT name FROM sqlite_master WHERE name = ?", (table,)):
+                for guild_id, channel_id in await legacy_db.fetchall(f"SELECT guild_id, channel_id FROM {table}"):
+                    rows.setdefault(int(guild_id), [None, None])[slot] = channel_id
+        if rows:
+            # Every cluster process imports on its first start; whichever
+            # comes second finds the rows already there.
+            await self.db.executemany(
+                "INSERT OR IGNORE INTO guild_settings (guild_id, log_channel_id, suggest_channel_id) VALUES (?, ?, ?)",
+                [(guild_id, log_channel_id, suggest_channel_id) for guild_id, (log_channel_id, suggest_channel_id) in rows.items()]
+            )
+            print(f"Imported settings for {len(rows)} guilds from the old databases")
+
+    def get(self, guild_id, key):
+        settings = self._cache.get(guild_id)
+        return DEFAULTS[key] if settings is None else settings[key]
+
+    async def set(self, guild_id, **changes):
+        for key in changes:
+            if key not in DEFAULTS:
+                raise KeyError(key)
+        settings = dict(self._cache.get(guild_id, DEFAULTS), **changes)
+        # Update the cache first so a second change made while this one is
+        # being written builds on it instead of overwriting it.
+        self._cache[guild_id] = settings
+        await self.db.execute("""
+            INSERT INTO guild_settings (guild_id, log_channel_id, suggest_channel_id, recap_enabled)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(guild_id) DO UPDATE SET
+                log_channel_id = excluded.log_channel_id,
+                suggest_channel_id = excluded.suggest_channel_id,
+                recap_enabled = excluded.recap_enabled
+        """, (guild_id, settings["log_channel_id"], settings["suggest_channel_id"], int(settings["recap_enabled"])))
+        self.bot.dispatch("guild_settings_update", guild_id, changes)